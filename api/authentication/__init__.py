@@ -4,11 +4,11 @@ from fastapi import APIRouter, Depends
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from api.helpers import load_participant
 from api.session import Session, Status, with_session
 from api.settings import SETTINGS
-from common.database import Participant, ParticipantRead, with_db
+from common.database import ParticipantRead, with_db
 
 from . import oauth, profile, providers
 
@@ -40,11 +40,9 @@ async def me(
         return Me(status=session.status, email=session.email)
 
     if session.status == Status.Authenticated:
-        participant = await db.get(
-            Participant,
-            session.id,
-            options=[selectinload(Participant.swag_tier)],
-        )
+        assert session.id is not None
+
+        participant = await load_participant(db, session.id, swag_tier=True)
         assert participant is not None
 
         return Me(status=session.status, participant=participant)
@@ -53,12 +51,7 @@ async def me(
 
 
 @router.get("/logout", name="Logout")
-async def logout() -> RedirectResponse:
+async def logout(session: Session = Depends(with_session)) -> RedirectResponse:
     response = RedirectResponse(SETTINGS.app_url)
-    response.delete_cookie(
-        key="session_id",
-        domain=SETTINGS.cookie_domain,
-        secure=SETTINGS.cookie_secure,
-        httponly=True,
-    )
+    await session.delete_cookie(response)
     return response
@@ -7,10 +7,11 @@ from opentelemetry.trace import get_current_span
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import Select
 
-from api.session import Session, with_oauth, with_session
+from api.session import Session, load_identity, with_oauth, with_session
 from api.settings import SETTINGS
-from common.database import Participant, Provider, with_db
+from common.database import Participant, Provider, hot, with_db
 
 from .client import OAuthClient
 
@@ -76,9 +77,7 @@ async def callback(
         )
 
     # Try to find the user by email
-    result = await db.execute(
-        select(Participant).where(Participant.email == user_info.email)
-    )
+    result = await db.execute(participant_by_email(user_info.email))
     participant: Optional[Participant] = result.scalars().first()
 
     # Redirect to the frontend and let it handle the state
@@ -86,9 +85,19 @@ async def callback(
 
     # Authenticate the user, or mark their profile as incomplete if they don't exist
     if participant is not None:
-        session.into_authenticated(participant.id)
+        identity = await load_identity(db, participant.id)
+        assert identity is not None
+
+        session.into_authenticated(participant.id, identity)
     else:
         session.into_incomplete_profile(user_info.email)
 
     await session.set_cookie(response)
     return response
+
+
+def participant_by_email(email: str) -> Select:
+    return select(Participant).where(Participant.email == email)
+
+
+hot("participant-by-email", participant_by_email(""))
@@ -3,7 +3,13 @@ from http import HTTPStatus
 from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.session import Session, with_incomplete_profile, with_user_id
+from api.session import (
+    Session,
+    load_identity,
+    versions,
+    with_incomplete_profile,
+    with_user_id,
+)
 from api.settings import SETTINGS
 from common.database import (
     Participant,
@@ -32,7 +38,10 @@ async def complete(
     db.add(participant)
     await db.commit()
 
-    session.into_authenticated(participant.id)
+    identity = await load_identity(db, participant.id)
+    assert identity is not None
+
+    session.into_authenticated(participant.id, identity)
     await session.set_cookie(response)
 
     await broadcast("authentication", "sign_up", participant_id=participant.id)
@@ -55,3 +64,5 @@ async def update(
 
     db.add(participant)
     await db.commit()
+
+    await versions.bump(user)
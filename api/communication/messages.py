@@ -9,6 +9,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from api.conditional import conditional
 from api.permissions import Role, requires_role
 from api.session import with_user_id
 from common.database import (
@@ -40,7 +41,12 @@ router = APIRouter(dependencies=[Depends(requires_role(Role.Organizer))])
 tracer = trace.get_tracer(__name__)
 
 
-@router.get("/", name="List messages", response_model=List[MessageList])
+@router.get(
+    "/",
+    name="List messages",
+    response_model=List[MessageList],
+    dependencies=[Depends(conditional("messages"))],
+)
 async def list(db: AsyncSession = Depends(with_db)):
     """
     Get a list of all the messages in the database
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+from hashlib import sha1
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+
+from common.database import versions
+
+
+class NotModified(Exception):
+    """
+    Stop handling a request whose cached response is still current
+    """
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def conditional(*tables: str, daily: bool = False) -> Callable[..., Awaitable[None]]:
+    """
+    Respond with `304 Not Modified` when the client's copy is still current, before any queries are run. The ETag is
+    derived from the versions of the tables the response is built from, so the endpoint's output must only change when
+    one of them is written to. The versions are bumped once a write is committed to the primary, so the response must be
+    read from the primary too, otherwise a lagging replica's stale response would be cached under the new ETag.
+    :param tables: the tables the response depends on
+    :param daily: whether the response also changes with the current date
+    """
+
+    async def dependency(request: Request, response: Response):
+        current = await versions.get(*tables)
+        if daily:
+            current.append(datetime.now(timezone.utc).date().isoformat())
+
+        key = "\n".join([request.url.path, request.url.query, *current])
+        etag = f'W/"{sha1(key.encode("utf-8")).hexdigest()}"'
+
+        if matches(request.headers.get("if-none-match"), etag):
+            raise NotModified(etag)
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, no-cache"
+
+    return dependency
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check if an `If-None-Match` header matches the ETag, using weak comparison
+    """
+    if if_none_match is None:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or strip_weak(etag) in map(strip_weak, tags)
+
+
+def strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
@@ -1,21 +1,36 @@
 from http import HTTPStatus
+from typing import Optional
 
 from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from common.database import Application, Participant, with_db
+from common.database import Participant, with_db
 
-from .session import with_user_id
+from .session import Identity, with_identity, with_user_id
+
+
+async def load_participant(
+    db: AsyncSession, id: int, *, swag_tier: bool = False
+) -> Optional[Participant]:
+    """
+    Load a participant in a single query
+    :param db: a database session
+    :param id: the participant's ID
+    :param swag_tier: whether to also load the participant's swag tier
+    """
+    options = [joinedload(Participant.swag_tier)] if swag_tier else []
+    return await db.get(Participant, id, options=options)
 
 
 async def with_current_participant(
     id: int = Depends(with_user_id),
     db: AsyncSession = Depends(with_db),
-):
+) -> Participant:
     """
     Get the current participant
     """
-    participant = await db.get(Participant, id)
+    participant = await load_participant(db, id)
     if participant is None:
         raise HTTPException(
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
@@ -25,23 +40,11 @@ async def with_current_participant(
     return participant
 
 
-async def with_current_application(
-    id: int = Depends(with_user_id),
-    db: AsyncSession = Depends(with_db),
-):
-    """
-    Get the current participant's application, may be None
-    """
-    return await db.get(Application, id)
-
-
-async def require_application_accepted(
-    application: Application = Depends(with_current_application),
-):
+async def require_application_accepted(identity: Identity = Depends(with_identity)):
     """
     Require that the participant's application was accepted
     """
-    if application is None or not application.accepted:
+    if not identity.accepted:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN,
             detail="application must be accepted",
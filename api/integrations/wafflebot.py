@@ -1,8 +1,8 @@
-from datetime import datetime
 from http import HTTPStatus
 from typing import List, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
 from sqlalchemy import update
@@ -10,6 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
+from api.conditional import conditional
+from api.schedule import EventDetails, schedule
 from api.settings import SETTINGS
 from common.database import (
     Application,
@@ -141,57 +143,24 @@ async def check_in(request: CheckInRequest, db: AsyncSession = Depends(with_db))
     await db.commit()
 
 
-class EventDetails(BaseModel):
-    id: int
-    name: str
-    description: Optional[str]
-
-    url: str
-
-    start: datetime
-    end: datetime
-
-    def __init__(
-        self,
-        id: int,
-        name: str,
-        valid_from: datetime,
-        valid_until: datetime,
-        code: str,
-        link: str,
-        track_attendance: bool,
-        **kwargs,
-    ):
-        if track_attendance or link is None:
-            url = f"{SETTINGS.app_url}/workshop/{code}"
-        else:
-            url = link
-
-        super().__init__(
-            id=id,
-            name=name,
-            start=valid_from,
-            end=valid_until,
-            url=url,
-            **kwargs,
-        )
-
-
-@router.get("/events", name="List events", response_model=List[EventDetails])
-async def events(db: AsyncSession = Depends(with_db)):
+@router.get(
+    "/events",
+    name="List events",
+    response_model=List[EventDetails],
+)
+async def events(request: Request) -> Response:
     """
     Get a list of all workshops
     """
-    result = await db.execute(
-        select(Event).where(Event.enabled).order_by(Event.valid_from)
-    )
-    return result.scalars().all()
+    snapshot = await schedule.get()
+    return snapshot.details.respond(request)
 
 
 @router.get(
     "/events/{key}",
     name="Get event details by a key",
     response_model=Optional[EventDetails],
+    dependencies=[Depends(conditional("events"))],
 )
 async def event_by(
     key: Union[int, str],
@@ -1,9 +1,19 @@
+from http import HTTPStatus
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse, UJSONResponse
+from fastapi.responses import PlainTextResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from common import database, kv, nats, tracing, version
+from common.registration import (
+    applied_ready,
+    claim_applied_rebuild,
+    claim_reconciliation,
+    reconciliation_overdue,
+    statistics_ready,
+)
+from common.tasks import tasks
 
 from . import (
     authentication,
@@ -15,15 +25,25 @@ from . import (
     statistics,
     workshops,
 )
+from .conditional import NotModified
+from .pagination import NEXT_CURSOR
+from .responses import DefaultResponse
 from .settings import SETTINGS
+from .workshops.buffer import attendance_buffer
 
-app = FastAPI(docs_url=None, swagger_ui_oauth2_redirect_url=None, redoc_url="/docs")
+app = FastAPI(
+    docs_url=None,
+    swagger_ui_oauth2_redirect_url=None,
+    redoc_url="/docs",
+    default_response_class=DefaultResponse,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[SETTINGS.app_url],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
-    allow_headers=["Cookie"],
+    allow_headers=["Cookie", "If-None-Match"],
+    expose_headers=[NEXT_CURSOR, "ETag"],
 )
 
 tracing.init(app)
@@ -41,6 +61,23 @@ app.include_router(workshops.router, prefix="/workshops")
 @app.on_event("startup")
 async def startup():
     await database.warm_up()
+    kv.listen()
+
+    # Build the applied index if it is missing, i.e. on first deploy or after Redis is flushed
+    if not await applied_ready() and await claim_applied_rebuild():
+        await tasks.registration.rebuild_applied_index()
+
+    # Rebuild the statistics if they are missing or are no longer being reconciled
+    if (
+        not await statistics_ready() or await reconciliation_overdue()
+    ) and await claim_reconciliation():
+        await tasks.registration.reconcile_statistics()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await attendance_buffer.close()
+    await kv.close()
 
 
 @app.get("/health", name="Healthcheck", response_class=PlainTextResponse)
@@ -52,9 +89,17 @@ async def health():
     return f"version: {version.commit}"
 
 
+@app.exception_handler(NotModified)
+async def not_modified_handler(_request: Request, exception: NotModified):
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers={"ETag": exception.etag, "Cache-Control": "private, no-cache"},
+    )
+
+
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(_request: Request, exception: StarletteHTTPException):
-    return UJSONResponse(
+    return DefaultResponse(
         {"success": False, "reason": exception.detail},
         status_code=exception.status_code,
         headers=getattr(exception, "headers", None),
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from . import settings
+from . import database, settings
 
 router = APIRouter()
+router.include_router(database.router, prefix="/database", tags=["Database"])
 router.include_router(settings.router, prefix="/settings", tags=["Settings"])
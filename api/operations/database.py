@@ -0,0 +1,18 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+from api.permissions import Role, requires_role
+from common.database import PoolStatistics, pool_statistics
+
+router = APIRouter(dependencies=[Depends(requires_role(Role.Organizer))])
+
+
+@router.get(
+    "/pool", response_model=List[PoolStatistics], name="Get connection pool usage"
+)
+async def pool():
+    """
+    Get the usage of each database connection pool in the worker handling the request
+    """
+    return pool_statistics()
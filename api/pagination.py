@@ -0,0 +1,131 @@
+import base64
+import binascii
+import json
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Query, Response
+from pydantic import ValidationError, parse_obj_as
+from pydantic.json import pydantic_encoder
+from sqlalchemy import tuple_
+from sqlalchemy.sql import ColumnElement, Select
+from sqlalchemy.types import TypeDecorator
+
+T = TypeVar("T")
+
+# The number of rows per page when only a cursor is given
+DEFAULT_LIMIT = 100
+
+# The most rows that can be requested in a single page
+MAX_LIMIT = 500
+
+# The response header containing the cursor for the next page
+NEXT_CURSOR = "X-Next-Cursor"
+
+
+class Pagination(object):
+    """
+    Keyset pagination over a set of stable, unique sort columns. Pagination is opt-in, when neither a cursor nor a
+    limit is requested all the rows are returned like before. The cursor for the following page is sent in the
+    `X-Next-Cursor` header, and is omitted on the last page.
+    """
+
+    def __init__(self, response: Response, cursor: Optional[str], limit: Optional[int]):
+        self.response = response
+        self.cursor = cursor
+        self.limit = limit or DEFAULT_LIMIT
+
+        self.enabled = cursor is not None or limit is not None
+
+        # The headers describing the page, for endpoints responding directly
+        self.headers: Dict[str, str] = {}
+
+    def apply(
+        self,
+        statement: Select,
+        *columns: ColumnElement,
+        descending: bool = False,
+    ) -> Select:
+        """
+        Restrict a statement to the requested page, replacing its ordering with the sort columns
+        :param statement: the statement to paginate
+        :param columns: the columns uniquely identifying a row, in sort order
+        :param descending: whether to sort the columns in descending order
+        """
+        if not self.enabled:
+            return statement
+
+        ordering = [c.desc() if descending else c.asc() for c in columns]
+        statement = statement.order_by(None).order_by(*ordering).limit(self.limit + 1)
+
+        if self.cursor is None:
+            return statement
+
+        key = tuple_(*columns)
+        values = tuple_(*decode(self.cursor, columns))
+        condition = key < values if descending else key > values
+
+        return statement.where(condition)
+
+    def page(self, rows: Sequence[T], key: Callable[[T], Sequence[Any]]) -> List[T]:
+        """
+        Trim the extra row used to detect further pages and set the cursor for the next page
+        :param rows: the rows returned by the paginated statement
+        :param key: extracts the values of the sort columns from a row
+        """
+        if not self.enabled or len(rows) <= self.limit:
+            return list(rows)
+
+        rows = rows[: self.limit]
+        self.headers[NEXT_CURSOR] = encode(key(rows[-1]))
+        self.response.headers.update(self.headers)
+
+        return list(rows)
+
+
+def with_pagination(
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+) -> Pagination:
+    """
+    Get the requested page
+    """
+    return Pagination(response, cursor, limit)
+
+
+def encode(values: Sequence[Any]) -> str:
+    """
+    Create an opaque cursor from the sort column values of the last row in a page
+    """
+    raw = json.dumps(list(values), default=pydantic_encoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("utf-8")
+
+
+def decode(cursor: str, columns: Sequence[ColumnElement]) -> List[Any]:
+    """
+    Extract the sort column values from a cursor, converting them to the columns' types
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+
+        return [
+            parse_obj_as(python_type(column), value)
+            for column, value in zip(columns, values)
+        ]
+    except (binascii.Error, ValueError, ValidationError, NotImplementedError):
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="invalid cursor")
+
+
+def python_type(column: ColumnElement) -> type:
+    """
+    Get the Python type of a column's values, looking through any type decorators
+    """
+    type_ = column.type
+    if isinstance(type_, TypeDecorator):
+        type_ = type_.impl
+
+    return type_.python_type
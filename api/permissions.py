@@ -3,9 +3,9 @@ from typing import Callable
 
 from fastapi import Depends, HTTPException
 
-from common.database import Participant, Role
+from common.database import Role
 
-from .helpers import with_current_participant
+from .session import Identity, with_identity
 
 
 def requires_role(*roles: Role) -> Callable[[], Role]:
@@ -15,12 +15,10 @@ def requires_role(*roles: Role) -> Callable[[], Role]:
     :return: the matched role
     """
 
-    def validator(
-        participant: Participant = Depends(with_current_participant),
-    ) -> Role:
+    def validator(identity: Identity = Depends(with_identity)) -> Role:
         for r in roles:
-            if r.value == participant.role.value:
-                return participant.role
+            if r.value == identity.role.value:
+                return identity.role
 
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail="permission denied"
@@ -29,11 +27,11 @@ def requires_role(*roles: Role) -> Callable[[], Role]:
     return validator
 
 
-def is_admin(participant: Participant = Depends(with_current_participant)):
+def is_admin(identity: Identity = Depends(with_identity)):
     """
     Check that the user is an admin
     """
-    if not participant.is_admin:
+    if not identity.is_admin:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail="permission denied"
         )
@@ -0,0 +1,70 @@
+from typing import Any, Dict, Generic, List, Mapping, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy.future import select
+from sqlalchemy.sql import ColumnElement, Select
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class Projection(Generic[M]):
+    """
+    Select only the columns needed by a read model and build it directly from the resulting rows. Nested read models
+    are loaded by joining through the relationship of the same name, all in a single query. Rows are not added to the
+    session, and since the values come straight from the database, the models are built without being validated.
+    """
+
+    def __init__(self, model: Type[M], table: Any, **nested: "Projection"):
+        """
+        :param model: the read model to build
+        :param table: the table model to select the columns from
+        :param nested: projections for the fields containing a related read model
+        """
+        self.model = model
+        self.table = table
+        self.nested = nested
+
+        self.columns: List[Tuple[str, ColumnElement]] = [
+            (name, getattr(table, name))
+            for name in model.__fields__.keys()
+            if name not in nested
+        ]
+
+    def select(self) -> Select:
+        """
+        Create a statement selecting the needed columns, joined with any related tables
+        """
+        return self.__joins(select(*self.__labelled()).select_from(self.table))
+
+    def build(self, row: Mapping[str, Any]) -> M:
+        """
+        Construct the read model from a row returned by the projection's statement
+        :param row: the row as a mapping
+        """
+        return self.__build(row, "")  # type: ignore
+
+    def __labelled(self, prefix: str = "") -> List[ColumnElement]:
+        labelled = [column.label(prefix + name) for name, column in self.columns]
+        for name, projection in self.nested.items():
+            labelled.extend(projection.__labelled(f"{prefix}{name}__"))
+
+        return labelled
+
+    def __joins(self, statement: Select) -> Select:
+        for name, projection in self.nested.items():
+            optional = self.model.__fields__[name].allow_none
+            statement = statement.join(getattr(self.table, name), isouter=optional)
+            statement = projection.__joins(statement)
+
+        return statement
+
+    def __build(self, row: Mapping[str, Any], prefix: str) -> Optional[M]:
+        values: Dict[str, Any] = {name: row[prefix + name] for name, _ in self.columns}
+        for name, projection in self.nested.items():
+            values[name] = projection.__build(row, f"{prefix}{name}__")
+
+        # Outer joins produce all nulls when there is no related row
+        if prefix and all(value is None for value in values.values()):
+            return None
+
+        return self.model.construct(**values)
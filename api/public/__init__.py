@@ -1,34 +1,30 @@
-from datetime import datetime
-from typing import List, Optional
+from typing import List
 
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
 
-from common.database import Event, with_db
+from api.schedule import PublicEvent, schedule
 
 router = APIRouter(tags=["Public"])
 
 
-class PublicEvent(BaseModel):
-    id: int
-    name: str
-    description: Optional[str]
-
-    start: datetime
-    end: datetime
-
-    def __init__(self, valid_from: datetime, valid_until: datetime, **kwargs):
-        super().__init__(start=valid_from, end=valid_until, **kwargs)
-
-
 @router.get("/events", name="Get the event schedule", response_model=List[PublicEvent])
-async def events(db: AsyncSession = Depends(with_db)):
+async def events(request: Request) -> Response:
     """
     Get the public event schedule
     """
-    result = await db.execute(
-        select(Event).where(Event.enabled).order_by(Event.valid_from)
-    )
-    return result.scalars().all()
+    snapshot = await schedule.get()
+    return snapshot.public.respond(request)
+
+
+@router.get(
+    "/events.ics",
+    name="Get the event schedule as a calendar",
+    response_class=Response,
+)
+async def calendar(request: Request) -> Response:
+    """
+    Get the public event schedule as an iCalendar feed
+    """
+    snapshot = await schedule.get()
+    return snapshot.calendar.respond(request)
@@ -1,3 +1,5 @@
+import json
+from hashlib import sha256
 from http import HTTPStatus
 from typing import Dict, List, Optional
 from uuid import uuid4
@@ -7,15 +9,21 @@ from algoliasearch.search_index_async import SearchIndexAsync
 from fastapi import APIRouter, Depends, HTTPException
 from opentelemetry import trace
 from pydantic import BaseModel, validate_model
+from pydantic.json import pydantic_encoder
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql import Select
 
 from api.algolia import with_schools_index
+from api.pagination import Pagination, with_pagination
 from api.permissions import Role, requires_role
-from api.session import with_user_id
+from api.projection import Projection
+from api.responses import trusted
+from api.session import Identity, versions, with_identity, with_user_id
 from api.settings import SETTINGS
+from api.streaming import stream_json
 from common.aws import S3Client, with_s3
 from common.database import (
     Application,
@@ -26,12 +34,18 @@ from common.database import (
     ApplicationStatus,
     ApplicationUpdate,
     Participant,
+    ParticipantList,
     ParticipantRead,
     School,
     ServiceSettings,
+    SwagTier,
+    SwagTierList,
+    hot,
     with_db,
+    with_db_readonly,
 )
 from common.kv import NamespacedClient, with_kv
+from common.registration import discount_application, has_applied, mark_applied
 from common.tasks import broadcast
 
 
@@ -51,6 +65,19 @@ class GetResumeResponse(BaseModel):
 router = APIRouter()
 tracer = trace.get_tracer(__name__)
 
+# How long an in-progress application is kept after it was last changed
+AUTOSAVE_EXPIRY = 60 * 24 * 60 * 60
+
+# The autosave hash field containing the digest of all the other fields
+DIGEST_FIELD = "_digest"
+
+LIST_PROJECTION = Projection(
+    ApplicationList, Application, participant=Projection(ParticipantList, Participant)
+)
+PARTICIPANT_PROJECTION = Projection(
+    ParticipantRead, Participant, swag_tier=Projection(SwagTierList, SwagTier)
+)
+
 
 @router.get(
     "/",
@@ -59,24 +86,25 @@ tracer = trace.get_tracer(__name__)
 )
 async def list(
     role: Role = Depends(requires_role(Role.Sponsor, Role.Organizer)),
-    db: AsyncSession = Depends(with_db),
+    pagination: Pagination = Depends(with_pagination),
+    db: AsyncSession = Depends(with_db_readonly),
 ):
     """
     List all applications in db
     """
-    statement = (
-        select(Application)
-        .order_by(Application.created_at.desc())  # type: ignore
-        .options(
-            selectinload(Application.participant), selectinload(Application.school)
-        )
+    if not pagination.enabled:
+        return await stream_json(db, list_statement(role), LIST_PROJECTION)
+
+    statement = pagination.apply(
+        list_statement(role),
+        Application.created_at,
+        Application.participant_id,
+        descending=True,
     )
-    if role == Role.Sponsor:
-        statement = statement.where(Application.share_information)
-
     result = await db.execute(statement)
-    applications = result.scalars().all()
-    return applications
+    applications = [LIST_PROJECTION.build(row) for row in result.mappings()]
+    page = pagination.page(applications, lambda a: (a.created_at, a.participant.id))
+    return trusted(page, pagination.headers)
 
 
 @router.get(
@@ -85,20 +113,24 @@ async def list(
     name="List incomplete applications",
     dependencies=[Depends(requires_role(Role.Organizer))],
 )
-async def list_incomplete(db: AsyncSession = Depends(with_db)):
+async def list_incomplete(
+    pagination: Pagination = Depends(with_pagination),
+    db: AsyncSession = Depends(with_db_readonly),
+):
     """
     Get a list of all participants who have not completed their application
     """
     statement = (
-        select(Participant)
+        PARTICIPANT_PROJECTION.select()
         .outerjoin(Application, full=True)
         .where(Application.participant_id == None)
         .where(Participant.role == Role.Participant)
     )
 
-    result = await db.execute(statement)
-    participants = result.scalars().all()
-    return participants
+    result = await db.execute(pagination.apply(statement, Participant.id))
+    participants = [PARTICIPANT_PROJECTION.build(row) for row in result.mappings()]
+    page = pagination.page(participants, lambda p: (p.id,))
+    return trusted(page, pagination.headers)
 
 
 @router.post(
@@ -125,6 +157,10 @@ async def create_application(
             status_code=HTTPStatus.BAD_REQUEST, detail="applications are closed"
         )
 
+    # The index can only rule out an application, so confirm any conflict against the database
+    if await has_applied(id) is not False and await db.get(Application, id):
+        raise HTTPException(status_code=HTTPStatus.CONFLICT, detail="already applied")
+
     # Find the school by name
     with tracer.start_as_current_span("find-school"):
         statement = select(School).where(School.name == values.school)
@@ -162,8 +198,11 @@ async def create_application(
     except IntegrityError:
         raise HTTPException(status_code=HTTPStatus.CONFLICT, detail="already applied")
 
+    await mark_applied(id)
+    await versions.bump(id)
+
     # Delete the auto-save data
-    await kv.delete(str(id))
+    await kv.delete_many([str(id), autosave_key(id)])
 
     # Send the application received message
     await broadcast("registration", "new_application", participant_id=id)
@@ -204,11 +243,18 @@ async def create_application(
     dependencies=[Depends(requires_role(Role.Participant))],
 )
 async def get_autosave_application(
-    id: int = Depends(with_user_id), kv: NamespacedClient = Depends(with_kv("autosave"))
+    id: int = Depends(with_user_id),
+    kv: NamespacedClient = Depends(with_kv("autosave")),
 ):
     """
     Get the data for an in-progress application
     """
+    fields = await kv.hgetall(autosave_key(id))
+    fields.pop(DIGEST_FIELD, None)
+    if fields:
+        return {field: json.loads(value) for field, value in fields.items()}
+
+    # Fallback to autosaves stored before they were split into fields
     autosave = await kv.get(str(id), is_json=True)
     if autosave:
         return autosave
@@ -225,16 +271,33 @@ async def get_autosave_application(
 async def autosave_application(
     values: ApplicationAutosave,
     id: int = Depends(with_user_id),
-    db: AsyncSession = Depends(with_db),
+    identity: Identity = Depends(with_identity),
     kv: NamespacedClient = Depends(with_kv("autosave")),
 ):
     """
     Save an in-progress application
     """
     # Prevent auto-saving if already applied
-    application = await db.get(Application, id)
-    if not application:
-        await kv.set(str(id), values.dict())
+    if identity.application_status is not None:
+        return
+
+    fields = {
+        field: json.dumps(value, default=pydantic_encoder)
+        for field, value in values.dict().items()
+    }
+    digest = sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+    key = autosave_key(id)
+    if await kv.hget(key, DIGEST_FIELD) == digest:
+        return
+
+    # Write every field with the digest atomically, so the digest always describes what is stored
+    async with kv.pipeline(transaction=True) as pipeline:
+        pipeline.hset(key, {**fields, DIGEST_FIELD: digest})
+        pipeline.expire(key, AUTOSAVE_EXPIRY)
+
+        # Replace any autosave stored before they were split into fields
+        pipeline.delete(str(id))
 
 
 @router.get("/{id}", response_model=ApplicationRead, name="Read application")
@@ -258,14 +321,8 @@ async def read(
             status_code=HTTPStatus.FORBIDDEN, detail="invalid permissions"
         )
 
-    application = await db.get(
-        Application,
-        id,
-        options=[
-            selectinload(Application.participant),
-            selectinload(Application.school),
-        ],
-    )
+    result = await db.execute(read_statement(id))
+    application: Optional[Application] = result.scalars().first()
     if application is None:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="not found")
     elif role == Role.Sponsor and not application.share_information:
@@ -394,6 +451,8 @@ async def set_status(
     db.add(application)
     await db.commit()
 
+    await versions.bump(id)
+
 
 @router.delete(
     "/{id}",
@@ -419,6 +478,10 @@ async def delete(
         await db.delete(application)
         await db.commit()
 
+        await mark_applied(id, False)
+        await discount_application(application)
+        await versions.bump(id)
+
 
 def clean_application_response(application: Application, role: Role) -> ApplicationRead:
     """
@@ -435,3 +498,52 @@ def clean_application_response(application: Application, role: Role) -> Applicat
         response.flagged = None
 
     return response
+
+
+def autosave_key(id: int) -> str:
+    """
+    Get the key of the hash containing a participant's autosave fields
+    :param id: the participant's ID
+    """
+    return f"{id}:fields"
+
+
+def list_statement(role: Role) -> Select:
+    """
+    Build the query for listing applications
+    :param role: the requester's role
+    """
+    statement = LIST_PROJECTION.select().order_by(
+        Application.created_at.desc()  # type: ignore
+    )
+    if role == Role.Sponsor:
+        statement = statement.where(Application.share_information)
+
+    return statement
+
+
+def read_statement(id: int) -> Select:
+    """
+    Build the query for reading an application along with its participant and school
+    :param id: the application's ID
+    """
+    return (
+        select(Application)
+        .where(Application.participant_id == id)
+        .options(joinedload(Application.participant), joinedload(Application.school))
+    )
+
+
+hot(
+    "list-applications",
+    list_statement(Role.Organizer),
+    readonly=True,
+    full_scan=True,
+)
+hot(
+    "list-shared-applications",
+    list_statement(Role.Sponsor),
+    readonly=True,
+    full_scan=True,
+)
+hot("read-application", read_statement(0))
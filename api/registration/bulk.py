@@ -1,34 +1,75 @@
+import logging
+from datetime import datetime
 from http import HTTPStatus
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from opentelemetry import trace
-from pydantic import BaseModel
+from pydantic import BaseModel, root_validator
 from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import Select
 
 from api.permissions import Role, requires_role
+from api.session import versions
 from common.database import Application, ApplicationStatus, with_db
-from common.tasks import broadcast
+from common.tasks import broadcast_many
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 tracer = trace.get_tracer(__name__)
 
+# The most applications to update in a single transaction
+CHUNK_SIZE = 500
+
+
+class BulkFilter(BaseModel):
+    country: Optional[str]
+    school_id: Optional[str]
+    flagged: Optional[bool]
+
+    created_after: Optional[datetime]
+    created_before: Optional[datetime]
+
+    @root_validator()
+    def require_criteria(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        if all(value is None for value in values.values()):
+            raise ValueError("filter must restrict at least one field")
+
+        return values
+
 
 class BulkSetStatus(BaseModel):
     status: ApplicationStatus
-    ids: List[int]
+
+    # The applications to update, both are combined if present
+    ids: Optional[List[int]]
+    filter: Optional[BulkFilter]
+
+    @root_validator()
+    def require_selection(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        if values.get("ids") is None and values.get("filter") is None:
+            raise ValueError("either ids or filter must be provided")
+
+        return values
+
+
+class BulkSetStatusResult(BaseModel):
+    # The participants whose status changed, but whose notifications could not be sent
+    failed: List[int]
 
 
 @router.put(
     "/status",
-    status_code=HTTPStatus.NO_CONTENT,
+    response_model=BulkSetStatusResult,
     name="Bulk update application status",
     dependencies=[Depends(requires_role(Role.Organizer))],
 )
 async def bulk_set_status(params: BulkSetStatus, db: AsyncSession = Depends(with_db)):
     """
-    Set the status for a number of participant applications
+    Set the status for a number of pending participant applications, selected by ID and/or a filter. Any participants
+    whose status changed but could not be notified are returned.
     """
 
     if params.status == ApplicationStatus.PENDING:
@@ -37,14 +78,74 @@ async def bulk_set_status(params: BulkSetStatus, db: AsyncSession = Depends(with
             detail=f"application status cannot be set to '{params.status}'",
         )
 
+    selection = select_pending(params.ids, params.filter)
+    failed: List[int] = []
+
+    while True:
+        with tracer.start_as_current_span("update-chunk"):
+            # Wait for rows locked by concurrent updates so none are left pending
+            chunk = selection.limit(CHUNK_SIZE).with_for_update()
+            statement = (
+                update(Application)
+                .where(Application.participant_id.in_(chunk.scalar_subquery()))  # type: ignore
+                .values(status=params.status)
+                .returning(Application.participant_id)
+            )
+            result = await db.execute(statement)
+            changed = result.scalars().all()
+            await db.commit()
+
+        if len(changed) == 0:
+            break
+
+        # Only notify about the applications that actually changed
+        await versions.bump(*changed)
+        try:
+            undelivered = await broadcast_many(
+                "registration",
+                params.status.value,
+                ({"participant_id": id} for id in changed),
+            )
+            failed.extend(payload["participant_id"] for payload in undelivered)
+        except Exception as e:
+            # The chunk is already committed, so keep going with the rest
+            logger.exception(f"failed to broadcast '{params.status.value}': {e}")
+            failed.extend(changed)
+
+        if len(changed) < CHUNK_SIZE:
+            break
+
+    if failed:
+        logger.error(f"failed to broadcast '{params.status.value}' for {failed}")
+
+    return BulkSetStatusResult(failed=failed)
+
+
+def select_pending(ids: Optional[List[int]], filter: Optional[BulkFilter]) -> Select:
+    """
+    Build the query for the pending applications matching the selection
+    :param ids: the participant IDs to restrict to
+    :param filter: the application fields to restrict to
+    """
     statement = (
-        update(Application)
-        .where(Application.participant_id.in_(params.ids))  # type: ignore
+        select(Application.participant_id)
         .where(Application.status == ApplicationStatus.PENDING)
-        .values(status=params.status)
+        .order_by(Application.participant_id)
     )
-    await db.execute(statement)
-    await db.commit()
 
-    for id in params.ids:
-        await broadcast("registration", params.status.value, participant_id=id)
+    if ids is not None:
+        statement = statement.where(Application.participant_id.in_(ids))  # type: ignore
+
+    if filter is not None:
+        if filter.country is not None:
+            statement = statement.where(Application.country == filter.country)
+        if filter.school_id is not None:
+            statement = statement.where(Application.school_id == filter.school_id)
+        if filter.flagged is not None:
+            statement = statement.where(Application.flagged == filter.flagged)
+        if filter.created_after is not None:
+            statement = statement.where(Application.created_at >= filter.created_after)
+        if filter.created_before is not None:
+            statement = statement.where(Application.created_at < filter.created_before)
+
+    return statement
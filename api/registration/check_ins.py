@@ -5,14 +5,30 @@ from typing import List
 import pytz
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
 from api.helpers import require_application_accepted, with_current_participant
+from api.pagination import Pagination, with_pagination
 from api.permissions import Role, requires_role
-from common.database import Participant, ParticipantList, ServiceSettings, with_db
+from api.projection import Projection
+from api.responses import trusted
+from common.database import (
+    Participant,
+    ParticipantList,
+    ServiceSettings,
+    hot,
+    with_db,
+    with_db_readonly,
+)
 
 router = APIRouter()
 
+LIST_PROJECTION = Projection(ParticipantList, Participant)
+CHECKED_IN_STATEMENT = hot(
+    "checked-in-participants",
+    LIST_PROJECTION.select().where(Participant.checked_in),
+    readonly=True,
+)
+
 
 @router.get(
     "/",
@@ -20,15 +36,18 @@ router = APIRouter()
     dependencies=[Depends(requires_role(Role.Organizer))],
     response_model=List[ParticipantList],
 )
-async def info(db: AsyncSession = Depends(with_db)):
+async def info(
+    pagination: Pagination = Depends(with_pagination),
+    db: AsyncSession = Depends(with_db_readonly),
+):
     """
     Get all the checked-in participants
     """
+    result = await db.execute(pagination.apply(CHECKED_IN_STATEMENT, Participant.id))
+    participants = [LIST_PROJECTION.build(row) for row in result.mappings()]
 
-    result = await db.execute(select(Participant).where(Participant.checked_in))
-    participants = result.scalars().all()
-
-    return participants
+    page = pagination.page(participants, lambda p: (p.id,))
+    return trusted(page, pagination.headers)
 
 
 @router.put(
@@ -4,19 +4,40 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
+from api.pagination import Pagination, with_pagination
 from api.permissions import is_admin
-from common.database import Participant, ParticipantList, ParticipantRead, Role, with_db
+from api.projection import Projection
+from api.responses import trusted
+from api.session import versions
+from api.streaming import stream_json
+from common.database import (
+    Participant,
+    ParticipantList,
+    ParticipantRead,
+    Role,
+    with_db,
+    with_db_readonly,
+)
 
 router = APIRouter(dependencies=[Depends(is_admin)])
 
+LIST_PROJECTION = Projection(ParticipantList, Participant)
+
 
 @router.get("/", name="List participants", response_model=List[ParticipantList])
-async def list(db: AsyncSession = Depends(with_db)):
-    result = await db.execute(select(Participant))
-    participants = result.scalars().all()
-    return participants
+async def list(
+    pagination: Pagination = Depends(with_pagination),
+    db: AsyncSession = Depends(with_db_readonly),
+):
+    if not pagination.enabled:
+        return await stream_json(db, LIST_PROJECTION.select(), LIST_PROJECTION)
+
+    statement = pagination.apply(LIST_PROJECTION.select(), Participant.id)
+    result = await db.execute(statement)
+    participants = [LIST_PROJECTION.build(row) for row in result.mappings()]
+    page = pagination.page(participants, lambda p: (p.id,))
+    return trusted(page, pagination.headers)
 
 
 @router.get("/{id}", name="Read participant", response_model=ParticipantRead)
@@ -51,5 +72,7 @@ async def update_permissions(
     db.add(participant)
     await db.commit()
 
+    await versions.bump(id)
+
     await db.refresh(participant)
     return participant
@@ -12,6 +12,7 @@ from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
 from api.algolia import with_schools_index
+from api.pagination import Pagination, with_pagination
 from api.permissions import Role, requires_role
 from api.session import with_authenticated
 from common.database import (
@@ -22,6 +23,7 @@ from common.database import (
     SchoolRead,
     SchoolUpdate,
     with_db,
+    with_db_readonly,
 )
 
 router = APIRouter()
@@ -38,24 +40,30 @@ class SchoolWithCount(SchoolList):
     name="List schools",
     dependencies=[Depends(with_authenticated)],
 )
-async def list_schools(db: AsyncSession = Depends(with_db)):
+async def list_schools(
+    pagination: Pagination = Depends(with_pagination),
+    db: AsyncSession = Depends(with_db_readonly),
+):
     """
-    Get a list of all school.
+    Get a list of all school. Pages are ordered by school rather than by number of applications, since the counts
+    change as participants apply.
     """
+    count = func.count(Application.school_id)
     statement = (
         select(
             School.id,
             School.name,
             School.needs_review,
-            func.count(Application.school_id),
+            count,
         )
         .join(Application, isouter=True)
         .group_by(School.id)
-        .order_by(func.count(Application.school_id).desc())
+        .order_by(count.desc())
     )
-    result = await db.execute(statement)
+    result = await db.execute(pagination.apply(statement, School.id))
 
-    return parse_obj_as(List[SchoolWithCount], result.mappings().all())
+    schools = pagination.page(result.mappings().all(), lambda s: (s["id"],))
+    return parse_obj_as(List[SchoolWithCount], schools)
 
 
 @router.post(
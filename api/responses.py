@@ -0,0 +1,37 @@
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic.json import pydantic_encoder
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize a value to JSON, models are converted to dictionaries
+    :param content: the value to serialize
+    """
+    return orjson.dumps(
+        content, default=pydantic_encoder, option=orjson.OPT_NON_STR_KEYS
+    )
+
+
+class DefaultResponse(JSONResponse):
+    """
+    A JSON response serialized with orjson
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def trusted(
+    content: Any, headers: Optional[Mapping[str, str]] = None
+) -> DefaultResponse:
+    """
+    Respond with read models as-is. This skips validating against the route's response model and encoding with
+    `jsonable_encoder`, so the models are only serialized once. The caller is responsible for the content matching the
+    response model, including any models built with `construct()` from trusted database rows.
+    :param content: the read models to respond with
+    :param headers: any additional headers to send
+    """
+    return DefaultResponse(content, headers=headers)
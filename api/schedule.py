@@ -0,0 +1,244 @@
+import asyncio
+from datetime import datetime, timezone
+from hashlib import sha1
+from http import HTTPStatus
+from typing import List, NamedTuple, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy.future import select
+
+from common.database import Event, db_context
+from common.schedule import CHANGED, kv
+
+from .conditional import matches
+from .responses import dumps
+from .settings import SETTINGS
+
+PRODUCT_ID = "-//WaffleHacks//Application Portal//EN"
+
+# The maximum length of a line in a calendar, in octets
+CALENDAR_LINE_LENGTH = 75
+
+
+class PublicEvent(BaseModel):
+    id: int
+    name: str
+    description: Optional[str]
+
+    start: datetime
+    end: datetime
+
+    def __init__(self, valid_from: datetime, valid_until: datetime, **kwargs):
+        super().__init__(start=valid_from, end=valid_until, **kwargs)
+
+
+class EventDetails(BaseModel):
+    id: int
+    name: str
+    description: Optional[str]
+
+    url: str
+
+    start: datetime
+    end: datetime
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        valid_from: datetime,
+        valid_until: datetime,
+        code: str,
+        link: str,
+        track_attendance: bool,
+        **kwargs,
+    ):
+        if track_attendance or link is None:
+            url = f"{SETTINGS.app_url}/workshop/{code}"
+        else:
+            url = link
+
+        super().__init__(
+            id=id,
+            name=name,
+            start=valid_from,
+            end=valid_until,
+            url=url,
+            **kwargs,
+        )
+
+
+class Document(NamedTuple):
+    content: bytes
+    media_type: str
+
+    # Derived from the events rather than the content, so every process agrees on it
+    etag: str
+
+    def respond(self, request: Request) -> Response:
+        """
+        Send the document, or `304 Not Modified` if the client's copy is still current
+        :param request: the request being responded to
+        """
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        return Response(self.content, media_type=self.media_type, headers=headers)
+
+
+class Snapshot(NamedTuple):
+    # The schedule as a JSON array of public events
+    public: Document
+
+    # The schedule as a JSON array of event details
+    details: Document
+
+    # The schedule as an iCalendar feed
+    calendar: Document
+
+
+class Schedule(object):
+    """
+    An in-process, pre-serialized copy of the public event schedule. The snapshot is built on first use and rebuilt
+    after the task handlers announce that a workshop was updated or deleted, so serving it never touches the database.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = asyncio.Lock()
+
+        # Incremented on every invalidation so a build racing with a change is not kept
+        self._generation = 0
+
+        kv.subscribe(CHANGED, self.__on_message, reset=self.invalidate)
+
+    async def get(self) -> Snapshot:
+        """
+        Get the current snapshot, building it if needed
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        async with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+
+            generation = self._generation
+            snapshot = await build()
+
+            if generation == self._generation:
+                self._snapshot = snapshot
+
+            return snapshot
+
+    def invalidate(self):
+        """
+        Force the snapshot to be rebuilt on next access
+        """
+        self._generation += 1
+        self._snapshot = None
+
+    def __on_message(self, _message: str):
+        self.invalidate()
+
+
+schedule = Schedule()
+
+
+async def build() -> Snapshot:
+    """
+    Serialize the enabled events in every format
+    """
+    # Read from the primary, the invalidation is only sent once a change is committed there
+    async with db_context() as db:
+        result = await db.execute(
+            select(Event).where(Event.enabled).order_by(Event.valid_from)
+        )
+        events = result.scalars().all()
+
+    details = [EventDetails(**event.dict()) for event in events]
+    serialized = dumps(details)
+
+    version = sha1(serialized).hexdigest()
+    return Snapshot(
+        public=Document(
+            dumps([PublicEvent(**event.dict()) for event in events]),
+            "application/json",
+            f'"public-{version}"',
+        ),
+        details=Document(serialized, "application/json", f'"details-{version}"'),
+        calendar=Document(to_calendar(details), "text/calendar", f'"ics-{version}"'),
+    )
+
+
+def to_calendar(events: List[EventDetails]) -> bytes:
+    """
+    Generate an iCalendar feed from the events
+    :param events: the events to include
+    """
+    now = format_timestamp(datetime.now(timezone.utc))
+    host = SETTINGS.app_url.host
+
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODUCT_ID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+    ]
+    for event in events:
+        lines.extend(
+            [
+                "BEGIN:VEVENT",
+                f"UID:event-{event.id}@{host}",
+                f"DTSTAMP:{now}",
+                f"DTSTART:{format_timestamp(event.start)}",
+                f"DTEND:{format_timestamp(event.end)}",
+                f"SUMMARY:{escape_text(event.name)}",
+                f"URL:{event.url}",
+            ]
+        )
+        if event.description:
+            lines.append(f"DESCRIPTION:{escape_text(event.description)}")
+        lines.append("END:VEVENT")
+
+    lines.append("END:VCALENDAR")
+
+    return b"".join(fold(line.encode("utf-8")) for line in lines)
+
+
+def format_timestamp(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: bytes) -> bytes:
+    """
+    Split a content line into lines of at most 75 octets, without breaking up UTF-8 sequences
+    """
+    folded = b""
+    limit = CALENDAR_LINE_LENGTH
+    while len(line) > limit:
+        split = limit
+        while line[split] & 0xC0 == 0x80:
+            split -= 1
+
+        folded += line[:split] + b"\r\n "
+        line = line[split:]
+
+        # Continuation lines start with a space
+        limit = CALENDAR_LINE_LENGTH - 1
+
+    return folded + line + b"\r\n"
@@ -1,7 +1,7 @@
 import random
 import string
+import time
 from enum import Enum
-from hashlib import sha256
 from http import HTTPStatus
 from typing import Annotated, Optional
 
@@ -9,13 +9,20 @@ from fastapi import Cookie, Depends, HTTPException, Response
 from opentelemetry import trace
 from pydantic import BaseModel, PrivateAttr
 
-from common.kv import engine
+from common.database import db_context
+from common.kv import LocalCache
 
-from .settings import SETTINGS
+from ..settings import SETTINGS
+from .backends import IN_14_DAYS, backend, kv, kv_id_from_value
+from .identity import Identity, load_identity, versions
+from .revocations import revocations
 
-IN_14_DAYS = 14 * 24 * 60 * 60
-
-kv = engine.namespaced("session")
+# Parsed sessions keyed by the hashed cookie value, kept in sync across workers through pub/sub
+cache: LocalCache[str, "Session"] = LocalCache(
+    max_size=SETTINGS.session_cache_size,
+    ttl=SETTINGS.session_cache_ttl,
+)
+kv.subscribe("invalidate", cache.invalidate, reset=cache.clear)
 
 
 class Status(Enum):
@@ -28,6 +35,13 @@ class Status(Enum):
 class Session(BaseModel):
     status: Status
     _value: str = PrivateAttr()
+    _stored: bool = PrivateAttr(default=False)
+
+    # The value of the cookie the session was last loaded from or stored in
+    _cookie: Optional[str] = PrivateAttr(default=None)
+
+    # When the session was last written
+    issued_at: Optional[float]
 
     # Present when status == Status.OAuth
     state: Optional[str]
@@ -38,6 +52,7 @@ class Session(BaseModel):
 
     # Present when status == Status.Authenticated
     id: Optional[int]
+    identity: Optional[Identity]
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -54,6 +69,7 @@ class Session(BaseModel):
 
         self.email = None
         self.id = None
+        self.identity = None
 
     def into_incomplete_profile(self, email: str):
         self.status = Status.IncompleteProfile
@@ -62,10 +78,12 @@ class Session(BaseModel):
         self.state = None
         self.provider = None
         self.id = None
+        self.identity = None
 
-    def into_authenticated(self, user_id: int):
+    def into_authenticated(self, user_id: int, identity: Identity):
         self.status = Status.Authenticated
         self.id = user_id
+        self.identity = identity
 
         self.state = None
         self.provider = None
@@ -75,24 +93,39 @@ class Session(BaseModel):
         """
         Set the session as a cookie on the response
         """
+        self.issued_at = time.time()
+
+        cookie = await backend.store(self._value, self.dict(exclude_unset=True))
+        cache.invalidate(kv_id_from_value(cookie))
+        self._cookie = cookie
+        self._stored = True
+
         response.set_cookie(
             key="session_id",
-            value=self._value,
+            value=cookie,
             expires=IN_14_DAYS,
             domain=SETTINGS.cookie_domain,
             secure=SETTINGS.cookie_secure,
             httponly=True,
         )
 
-        await kv.set(
-            key=kv_id_from_value(self._value),
-            value=self.json(exclude_unset=True),
-            expires_in=IN_14_DAYS,
+    async def delete_cookie(self, response: Response):
+        """
+        Remove the session cookie from the response and ensure the session cannot be used again
+        """
+        response.delete_cookie(
+            key="session_id",
+            domain=SETTINGS.cookie_domain,
+            secure=SETTINGS.cookie_secure,
+            httponly=True,
         )
 
+        if self._stored:
+            await backend.delete(self._value)
 
-def kv_id_from_value(value: str) -> str:
-    return sha256(value.encode("utf-8")).hexdigest()
+        # Ensure this worker does not serve the session from its cache until the invalidation is received
+        if self._cookie is not None:
+            cache.invalidate(kv_id_from_value(self._cookie))
 
 
 async def with_session(
@@ -104,12 +137,28 @@ async def with_session(
     if session_id is None:
         return Session.unauthenticated()
 
-    session = await kv.get(kv_id_from_value(session_id))
-    if session is None:
+    key = kv_id_from_value(session_id)
+
+    cached = cache.get(key)
+    if cached is None:
+        loaded = await backend.load(session_id)
+        if loaded is None:
+            return Session.unauthenticated()
+
+        value, data = loaded
+        cached = Session.parse_obj(data)
+        cached._value = value
+        cached._cookie = session_id
+        cached._stored = True
+        cache.set(key, cached)
+
+    if cached.issued_at is not None and cached.issued_at + IN_14_DAYS < time.time():
+        return Session.unauthenticated()
+    elif await revocations.is_revoked(cached._value):
         return Session.unauthenticated()
 
-    session = Session.parse_raw(session)
-    session._value = session_id
+    # Routes mutate the session, so never hand out the cached instance
+    session = cached.copy()
 
     if session.id:
         trace.get_current_span().set_attribute("user.id", session.id)
@@ -153,3 +202,28 @@ def with_user_id(session: Session = Depends(with_authenticated)) -> int:
     """
     assert session.id is not None
     return session.id
+
+
+async def with_identity(
+    response: Response,
+    session: Session = Depends(with_authenticated),
+) -> Identity:
+    """
+    Retrieve the current user's identity from the session, reloading it if it is out of date
+    """
+    assert session.id is not None
+
+    identity = session.identity
+    if identity is None or await versions.is_stale(session.id, identity):
+        async with db_context() as db:
+            identity = await load_identity(db, session.id)
+
+        if identity is None:
+            raise HTTPException(
+                status_code=HTTPStatus.UNAUTHORIZED, detail="unauthorized"
+            )
+
+        session.identity = identity
+        await session.set_cookie(response)
+
+    return identity
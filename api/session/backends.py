@@ -0,0 +1,176 @@
+import base64
+import hmac
+import json
+import time
+from abc import ABC, abstractmethod
+from hashlib import sha256
+from typing import Any, Dict, Optional, Tuple, Type
+
+from pydantic.json import pydantic_encoder
+
+from common.kv import compact, engine
+
+from ..settings import SETTINGS, SessionBackend
+from .revocations import revocations
+
+# Encrypting sessions is optional, it is installed with the `encryption` extra
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None  # type: ignore
+
+IN_14_DAYS = 14 * 24 * 60 * 60
+
+kv = engine.namespaced("session", compact)
+
+
+def kv_id_from_value(value: str) -> str:
+    return sha256(value.encode("utf-8")).hexdigest()
+
+
+class Backend(ABC):
+    @abstractmethod
+    async def load(self, cookie: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Load a session from the value of its cookie
+        :param cookie: the raw cookie value
+        :return: the session's identifier and its contents, if valid
+        """
+
+    @abstractmethod
+    async def store(self, value: str, data: Dict[str, Any]) -> str:
+        """
+        Persist a session
+        :param value: the session's identifier
+        :param data: the session's contents
+        :return: the value to set the cookie to
+        """
+
+    @abstractmethod
+    async def delete(self, value: str):
+        """
+        Remove a session so it can no longer be used
+        :param value: the session's identifier
+        """
+
+
+class RedisBackend(Backend):
+    """
+    Store sessions server-side, the cookie is a random identifier
+    """
+
+    async def load(self, cookie: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        data = await kv.get(kv_id_from_value(cookie), is_json=True)
+        if data is None:
+            return None
+
+        return cookie, data
+
+    async def store(self, value: str, data: Dict[str, Any]) -> str:
+        key = kv_id_from_value(value)
+
+        async with kv.pipeline() as pipeline:
+            pipeline.set(key, data, expires_in=IN_14_DAYS)
+
+            # Ensure no worker serves the previous state
+            pipeline.publish("invalidate", key)
+
+        return value
+
+    async def delete(self, value: str):
+        key = kv_id_from_value(value)
+
+        async with kv.pipeline() as pipeline:
+            pipeline.delete(key)
+            pipeline.publish("invalidate", key)
+
+
+class SignedCookieBackend(Backend):
+    """
+    Store sessions client-side in an HMAC-signed, and optionally encrypted, cookie. Logging out cannot remove the
+    cookie from the client, so sessions are revoked instead.
+    """
+
+    def __init__(self, secret: str, encryption_key: Optional[str] = None):
+        self._secret = secret.encode("utf-8")
+
+        self._fernet = None
+        self._decode_errors: Tuple[Type[Exception], ...] = (ValueError,)
+
+        if encryption_key is not None:
+            if Fernet is None:
+                raise RuntimeError(
+                    "the cryptography package is required to encrypt sessions, install it with the encryption extra"
+                )
+
+            self._fernet = Fernet(encryption_key)
+            self._decode_errors += (InvalidToken,)
+
+    async def load(self, cookie: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        envelope = self.__open(cookie)
+        if envelope is None:
+            return None
+
+        value, data = json.loads(envelope)
+        return value, data
+
+    async def store(self, value: str, data: Dict[str, Any]) -> str:
+        envelope = json.dumps([value, data], default=pydantic_encoder)
+
+        if self._fernet is None:
+            payload = urlsafe_encode(envelope.encode("utf-8"))
+        else:
+            # Fernet tokens are already URL-safe, only the padding needs to be removed
+            token = self._fernet.encrypt(envelope.encode("utf-8"))
+            payload = token.decode("utf-8").rstrip("=")
+
+        return f"{payload}.{self.__sign(payload)}"
+
+    async def delete(self, value: str):
+        await revocations.revoke_session(value, time.time() + IN_14_DAYS)
+
+    def __open(self, cookie: str) -> Optional[str]:
+        """
+        Verify the cookie's signature and decode its contents
+        """
+        payload, _, signature = cookie.rpartition(".")
+        if not hmac.compare_digest(signature, self.__sign(payload)):
+            return None
+
+        try:
+            if self._fernet is None:
+                return urlsafe_decode(payload).decode("utf-8")
+            else:
+                token = payload + "=" * (-len(payload) % 4)
+                return self._fernet.decrypt(token.encode("utf-8")).decode("utf-8")
+        except self._decode_errors:
+            return None
+
+    def __sign(self, payload: str) -> str:
+        digest = hmac.digest(self._secret, payload.encode("utf-8"), "sha256")
+        return urlsafe_encode(digest)
+
+
+def urlsafe_encode(value: bytes) -> str:
+    return base64.urlsafe_b64encode(value).rstrip(b"=").decode("utf-8")
+
+
+def urlsafe_decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def select_backend() -> Backend:
+    """
+    Create the backend configured in the settings
+    """
+    if SETTINGS.session_backend == SessionBackend.Cookie:
+        assert SETTINGS.session_secret is not None
+        return SignedCookieBackend(
+            SETTINGS.session_secret, SETTINGS.session_encryption_key
+        )
+
+    return RedisBackend()
+
+
+# Created on import, so a misconfigured backend stops the API from starting instead of failing requests
+backend = select_backend()
@@ -0,0 +1,200 @@
+import secrets
+from typing import Dict, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import Select
+
+from common.database import Application, ApplicationStatus, Participant, Role, hot
+from common.kv import engine
+
+# A hash of participant ID to the number of times their identity changed
+REVISIONS = "identity-revisions"
+
+# Identifies the current set of revisions, changing whenever they are lost so old revisions are never reused
+EPOCH = "epoch"
+
+# Gets the epoch, creating it if the revisions were lost, along with a participant's revision
+CURRENT_SCRIPT = """
+redis.call('HSETNX', KEYS[1], 'epoch', ARGV[2])
+return {redis.call('HGET', KEYS[1], 'epoch'), redis.call('HGET', KEYS[1], ARGV[1]) or '0'}
+"""
+
+# Increments the participants' revisions, returning the epoch, creating it if the revisions were lost, followed by
+# the new revisions
+BUMP_SCRIPT = """
+redis.call('HSETNX', KEYS[1], 'epoch', ARGV[1])
+local result = {redis.call('HGET', KEYS[1], 'epoch')}
+for i = 2, #ARGV do
+    result[i] = redis.call('HINCRBY', KEYS[1], ARGV[i], 1)
+end
+return result
+"""
+
+# Gets the epoch, creating it if the revisions were lost, along with every participant's revision
+LOAD_SCRIPT = """
+redis.call('HSETNX', KEYS[1], 'epoch', ARGV[1])
+return redis.call('HGETALL', KEYS[1])
+"""
+
+kv = engine.namespaced("session")
+
+
+class Identity(BaseModel):
+    """
+    A snapshot of the fields needed to authorize a participant
+    """
+
+    role: Role
+    is_admin: bool
+    application_status: Optional[ApplicationStatus]
+
+    # How many times the identity had changed when the snapshot was taken, and the epoch of that count. Snapshots
+    # taken before revisions were tracked, or from a previous epoch, are always considered stale.
+    epoch: Optional[str] = None
+    revision: int = -1
+
+    @property
+    def accepted(self) -> bool:
+        return self.application_status == ApplicationStatus.ACCEPTED
+
+
+async def load_identity(db: AsyncSession, participant_id: int) -> Optional[Identity]:
+    """
+    Take a snapshot of a participant's identity
+    :param db: a database session
+    :param participant_id: the participant to load
+    """
+    # Read the revision before the identity so any concurrent change marks the snapshot as stale
+    epoch, revision = await versions.current(participant_id)
+
+    result = await db.execute(identity_statement(participant_id))
+    row = result.first()
+    if row is None:
+        return None
+
+    role, is_admin, status = row
+    return Identity(
+        role=role,
+        is_admin=is_admin,
+        application_status=status,
+        epoch=epoch,
+        revision=revision,
+    )
+
+
+def identity_statement(participant_id: int) -> Select:
+    """
+    Build the query for a participant's identity
+    :param participant_id: the participant to load
+    """
+    return (
+        select(Participant.role, Participant.is_admin, Application.status)
+        .select_from(Participant)
+        .outerjoin(Application)
+        .where(Participant.id == participant_id)
+    )
+
+
+hot("load-identity", identity_statement(0))
+
+
+class Versions(object):
+    """
+    An in-process mirror of each participant's identity revision. Profile, permission, and application status writes
+    increment the revision in Redis, causing any older snapshots to be reloaded. Revisions are counters rather than
+    timestamps, so they do not depend on the clocks of the hosts agreeing, and belong to an epoch that changes if they
+    are lost from Redis. Updates are propagated to every worker
+    through pub/sub, so checking a snapshot never requires a round trip.
+    """
+
+    def __init__(self):
+        # Participant ID -> the participant's latest revision
+        self._changed: Dict[int, int] = {}
+        self._epoch: Optional[str] = None
+
+        self._loaded = False
+
+        kv.subscribe("identity", self.__on_message, reset=self.__load)
+
+    async def is_stale(self, participant_id: int, identity: Identity) -> bool:
+        """
+        Check if an identity snapshot is out of date
+        :param participant_id: the participant the snapshot belongs to
+        :param identity: the snapshot to check
+        """
+        # The revisions may have been lost since the mirror was loaded, which starts a new epoch
+        if not self._loaded or identity.epoch != self._epoch:
+            await self.__load()
+
+        if identity.epoch != self._epoch:
+            return True
+
+        return identity.revision < self._changed.get(participant_id, 0)
+
+    async def current(self, participant_id: int) -> Tuple[str, int]:
+        """
+        Get the current epoch and a participant's latest revision from Redis
+        :param participant_id: the participant to get the revision of
+        """
+        epoch, revision = await kv.eval(
+            CURRENT_SCRIPT, [REVISIONS], [str(participant_id), secrets.token_hex(8)]
+        )
+        return epoch, int(revision)
+
+    async def bump(self, *participant_ids: int):
+        """
+        Mark the participants' identities as changed
+        :param participant_ids: the participants that changed
+        """
+        if len(participant_ids) == 0:
+            return
+
+        epoch, *revisions = await kv.eval(
+            BUMP_SCRIPT,
+            [REVISIONS],
+            [secrets.token_hex(8), *map(str, participant_ids)],
+        )
+        changes = dict(zip(participant_ids, revisions))
+        self.__update(epoch, changes)
+
+        message = ",".join(f"{id}:{revision}" for id, revision in changes.items())
+        await kv.publish("identity", f"{epoch}|{message}")
+
+    def __update(self, epoch: str, changes: Dict[int, int]):
+        # The mirror's revisions are meaningless in a new epoch, so reload it on next use
+        if epoch != self._epoch:
+            self._loaded = False
+            return
+
+        for id, revision in changes.items():
+            # Messages may arrive after a newer revision was already seen
+            if revision > self._changed.get(id, 0):
+                self._changed[id] = revision
+
+    def __on_message(self, message: str):
+        epoch, changes = message.split("|", 1)
+        self.__update(
+            epoch,
+            {
+                int(id): int(revision)
+                for id, revision in (
+                    change.split(":", 1) for change in changes.split(",")
+                )
+            },
+        )
+
+    async def __load(self):
+        """
+        Replace the local mirror with the current revisions
+        """
+        raw = await kv.eval(LOAD_SCRIPT, [REVISIONS], [secrets.token_hex(8)])
+        revisions = dict(zip(raw[::2], raw[1::2]))
+
+        self._epoch = revisions.pop(EPOCH)
+        self._changed = {int(id): int(revision) for id, revision in revisions.items()}
+        self._loaded = True
+
+
+versions = Versions()
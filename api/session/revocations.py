@@ -0,0 +1,67 @@
+import time
+from typing import Dict
+
+from common.kv import engine
+
+SESSIONS = "revoked-sessions"
+
+kv = engine.namespaced("session")
+
+
+class Revocations(object):
+    """
+    An in-process mirror of the revoked sessions stored in Redis. Sessions are revoked when logging out. Updates are
+    propagated to every worker through pub/sub, so checking for a revocation never requires a round trip.
+    """
+
+    def __init__(self):
+        # Session ID -> when the session would have expired
+        self._sessions: Dict[str, float] = {}
+
+        self._loaded = False
+
+        kv.subscribe("revoked", self.__on_message, reset=self.__load)
+
+    async def is_revoked(self, value: str) -> bool:
+        """
+        Check if a session was revoked
+        :param value: the session's identifier
+        """
+        if not self._loaded:
+            await self.__load()
+
+        expires_at = self._sessions.get(value)
+        return expires_at is not None and expires_at > time.time()
+
+    async def revoke_session(self, value: str, expires_at: float):
+        """
+        Revoke a single session
+        :param value: the session's identifier
+        :param expires_at: when the session would have expired
+        """
+        self._sessions[value] = expires_at
+
+        async with kv.pipeline() as pipeline:
+            pipeline.zadd(SESSIONS, {value: expires_at})
+            pipeline.publish("revoked", f"{value}:{expires_at}")
+
+    def __on_message(self, message: str):
+        value, expires_at = message.rsplit(":", 1)
+        self._sessions[value] = float(expires_at)
+
+    async def __load(self):
+        """
+        Replace the local mirror with the current revocations
+        """
+        now = time.time()
+
+        async with kv.pipeline(transaction=True) as pipeline:
+            pipeline.zremrangebyscore(SESSIONS, "-inf", now)
+            pipeline.zrangebyscore(SESSIONS, now, "+inf")
+
+        _, sessions = pipeline.results
+        self._sessions = dict(sessions)
+        self._loaded = True
+
+
+revocations = Revocations()
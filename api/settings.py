@@ -1,4 +1,14 @@
-from pydantic import BaseSettings, HttpUrl
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from pydantic import BaseSettings, HttpUrl, validator
+
+
+class SessionBackend(Enum):
+    # Sessions are stored server-side, the cookie only holds a random identifier
+    Redis = "redis"
+    # Sessions are stored in a signed (and optionally encrypted) cookie
+    Cookie = "cookie"
 
 
 class Settings(BaseSettings):
@@ -19,6 +29,21 @@ class Settings(BaseSettings):
     cookie_domain: str
     cookie_secure: bool
 
+    # Where sessions are stored
+    session_backend: SessionBackend = SessionBackend.Redis
+
+    # The key for signing cookie-based sessions, and an optional Fernet key for encrypting them
+    session_secret: Optional[str]
+    session_encryption_key: Optional[str]
+
+    # In-process session cache configuration, the TTL is in seconds
+    session_cache_size: int = 4096
+    session_cache_ttl: int = 60
+
+    # In-process cache of workshops by code, the TTL is in seconds
+    event_cache_size: int = 256
+    event_cache_ttl: int = 60
+
     # The domain emails must end with to be automatically assigned organizer permissions
     organizer_email_domain: str
 
@@ -26,5 +51,14 @@ class Settings(BaseSettings):
     # TODO: replace this with something more robust
     wafflebot_key: str
 
+    @validator("session_secret", always=True)
+    def secret_required_for_cookies(
+        cls, value: Optional[str], values: Dict[str, Any]
+    ) -> Optional[str]:
+        if values.get("session_backend") == SessionBackend.Cookie and not value:
+            raise ValueError("a secret is required for cookie-based sessions")
+
+        return value
+
 
 SETTINGS = Settings()
@@ -4,12 +4,28 @@ from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from api.conditional import conditional
 from api.permissions import Role, requires_role
 from common.database import Participant, with_db
+from common.registration import STATISTICS_VERSION
 
 from . import registration
 
-router = APIRouter(dependencies=[Depends(requires_role(Role.Organizer))])
+router = APIRouter(
+    dependencies=[
+        Depends(requires_role(Role.Organizer)),
+        # The versions are bumped on commit to the primary, so the statistics are read from it as well
+        Depends(
+            conditional(
+                "applications",
+                "schools",
+                "participants",
+                STATISTICS_VERSION,
+                daily=True,
+            )
+        ),
+    ]
+)
 router.include_router(
     registration.router,
     prefix="/registration",
@@ -1,17 +1,26 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from sqlalchemy import Integer, case, cast, extract, func
+from sqlalchemy import Integer, case, cast, extract, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.sql import Select
 
 from common.database import Application, School, with_db
+from common.registration import get_school_names, get_statistics
 
 router = APIRouter()
 
+AGE = cast(extract("year", func.age(Application.date_of_birth)), Integer)
+EXPERIENCE = case(
+    (Application.hackathons_attended == 0, "None"),
+    (Application.hackathons_attended.in_([1, 2]), "Beginner (1-2)"),  # type: ignore
+    (Application.hackathons_attended.in_([3, 4, 5]), "Intermediate (3-5)"),  # type: ignore
+    else_="Expert (6+)",
+)
+
 
 class Counts(BaseModel):
     accepted: int = 0
@@ -21,6 +30,10 @@ class Counts(BaseModel):
 
 @router.get("/", response_model=Counts)
 async def status(db: AsyncSession = Depends(with_db)):
+    counts = await get_statistics("status")
+    if counts is not None:
+        return counts
+
     result = await db.execute(grouped_count("status"))
     return {row.label.value: row.count for row in result.all()}
 
@@ -41,6 +54,11 @@ async def per_day(
     if start is None:
         start = end - timedelta(days=7)
 
+    counts = await get_statistics("day")
+    if counts is not None:
+        first, last = start.date().isoformat(), end.date().isoformat()
+        return [entry for entry in to_entries(counts) if first <= entry.label <= last]
+
     result = await db.execute(
         select(
             func.date_trunc("day", Application.created_at).label("label"),
@@ -81,6 +99,14 @@ class SchoolStatisticEntry(BaseModel):
 
 @router.get("/school", response_model=List[SchoolStatisticEntry])
 async def school(db: AsyncSession = Depends(with_db)):
+    counts = await get_statistics("school")
+    if counts is not None:
+        names = await get_school_names()
+        return [
+            SchoolStatisticEntry(id=id, name=names.get(id, ""), count=count)
+            for id, count in counts.items()
+        ]
+
     result = await db.execute(
         select(School.id, School.name, func.count(School.id))
         .join(Application.school)
@@ -91,14 +117,13 @@ async def school(db: AsyncSession = Depends(with_db)):
 
 @router.get("/experience", response_model=List[StatisticEntry])
 async def experience(db: AsyncSession = Depends(with_db)):
+    counts = await get_statistics("experience")
+    if counts is not None:
+        return to_entries(counts)
+
     result = await db.execute(
         select(
-            case(
-                (Application.hackathons_attended == 0, "None"),
-                (Application.hackathons_attended.in_([1, 2]), "Beginner (1-2)"),  # type: ignore
-                (Application.hackathons_attended.in_([3, 4, 5]), "Intermediate (3-5)"),  # type: ignore
-                else_="Expert (6+)",
-            ).label("label"),
+            EXPERIENCE.label("label"),
             func.count(Application.participant_id),
         ).group_by("label")
     )
@@ -107,6 +132,10 @@ async def experience(db: AsyncSession = Depends(with_db)):
 
 @router.get("/graduation-year", response_model=List[StatisticEntry])
 async def graduation_year(db: AsyncSession = Depends(with_db)):
+    counts = await get_statistics("graduation_year")
+    if counts is not None:
+        return sorted(to_entries(counts), key=lambda entry: int(entry.label))
+
     statement = grouped_count("graduation_year").order_by(Application.graduation_year)
     result = await db.execute(statement)
     return result.all()
@@ -114,12 +143,20 @@ async def graduation_year(db: AsyncSession = Depends(with_db)):
 
 @router.get("/country", response_model=List[StatisticEntry])
 async def country(db: AsyncSession = Depends(with_db)):
+    counts = await get_statistics("country")
+    if counts is not None:
+        return to_entries(counts)
+
     result = await db.execute(grouped_count("country"))
     return result.all()
 
 
 @router.get("/gender", response_model=List[StatisticEntry])
 async def gender(db: AsyncSession = Depends(with_db)):
+    counts = await get_statistics("gender")
+    if counts is not None:
+        return to_entries(counts)
+
     result = await db.execute(grouped_count("gender"))
     return [
         StatisticEntry(label=row.label.value, count=row.count) for row in result.all()
@@ -128,24 +165,162 @@ async def gender(db: AsyncSession = Depends(with_db)):
 
 @router.get("/level-of-study", response_model=List[StatisticEntry])
 async def level_of_study(db: AsyncSession = Depends(with_db)):
+    counts = await get_statistics("level_of_study")
+    if counts is not None:
+        return to_entries(counts)
+
     result = await db.execute(grouped_count("level_of_study"))
     return result.all()
 
 
 @router.get("/major", response_model=List[StatisticEntry])
 async def major(db: AsyncSession = Depends(with_db)):
+    counts = await get_statistics("major")
+    if counts is not None:
+        return to_entries(counts)
+
     result = await db.execute(grouped_count("major"))
     return result.all()
 
 
 @router.get("/race-ethnicity", response_model=List[StatisticEntry])
 async def race_ethnicity(db: AsyncSession = Depends(with_db)):
+    counts = await get_statistics("race_ethnicity")
+    if counts is not None:
+        return to_entries(counts)
+
     result = await db.execute(grouped_count("race_ethnicity"))
     return [
         StatisticEntry(label=row.label.value, count=row.count) for row in result.all()
     ]
 
 
+class Dashboard(BaseModel):
+    status: Counts
+    age: List[StatisticEntry]
+    school: List[SchoolStatisticEntry]
+    experience: List[StatisticEntry]
+    graduation_year: List[StatisticEntry]
+    country: List[StatisticEntry]
+    gender: List[StatisticEntry]
+    level_of_study: List[StatisticEntry]
+    major: List[StatisticEntry]
+    race_ethnicity: List[StatisticEntry]
+
+
+# The columns grouped by in the dashboard query, in the order of the grouping bitmask
+DASHBOARD_DIMENSIONS = [
+    "status",
+    "age",
+    "school_id",
+    "experience",
+    "graduation_year",
+    "country",
+    "gender",
+    "level_of_study",
+    "major",
+    "race_ethnicity",
+]
+
+
+def dashboard_statement() -> Select:
+    """
+    Build a query counting the applications by every dashboard dimension in a single pass over the table. Each row
+    belongs to one grouping set, identified by the bit left unset in the `grouping` bitmask.
+    """
+    values = (
+        select(
+            Application.status,
+            AGE.label("age"),
+            Application.school_id,
+            School.name.label("school_name"),  # type: ignore
+            EXPERIENCE.label("experience"),
+            Application.graduation_year,
+            Application.country,
+            Application.gender,
+            Application.level_of_study,
+            Application.major,
+            Application.race_ethnicity,
+        )
+        .join(School)
+        .subquery()
+    )
+
+    dimensions = [getattr(values.c, name) for name in DASHBOARD_DIMENSIONS]
+    sets = [
+        tuple_(values.c.school_id, values.c.school_name)
+        if name == "school_id"
+        else getattr(values.c, name)
+        for name in DASHBOARD_DIMENSIONS
+    ]
+
+    return select(
+        values.c.school_name,
+        *dimensions,
+        func.grouping(*dimensions).label("grouping"),
+        func.count().label("count"),
+    ).group_by(func.grouping_sets(*sets))
+
+
+DASHBOARD_STATEMENT = dashboard_statement()
+
+
+@router.get("/dashboard", response_model=Dashboard)
+async def dashboard(db: AsyncSession = Depends(with_db)):
+    """
+    Get all the registration statistics shown on the dashboard at once
+    """
+    groups: Dict[str, List[Any]] = {name: [] for name in DASHBOARD_DIMENSIONS}
+
+    result = await db.execute(DASHBOARD_STATEMENT)
+    for row in result.all():
+        for i, name in enumerate(DASHBOARD_DIMENSIONS):
+            if row.grouping & (1 << (len(DASHBOARD_DIMENSIONS) - 1 - i)) == 0:
+                groups[name].append(row)
+                break
+
+    def entries(name: str) -> List[StatisticEntry]:
+        counts = [(getattr(row, name), row.count) for row in groups[name]]
+        return [
+            StatisticEntry(label=str(label), count=count)
+            for label, count in sorted(c for c in counts if c[0] is not None)
+        ]
+
+    return Dashboard(
+        status=Counts(**{row.status.value: row.count for row in groups["status"]}),
+        age=entries("age"),
+        school=[
+            SchoolStatisticEntry(
+                id=row.school_id, name=row.school_name, count=row.count
+            )
+            for row in groups["school_id"]
+        ],
+        experience=entries("experience"),
+        graduation_year=entries("graduation_year"),
+        country=entries("country"),
+        gender=[
+            StatisticEntry(label=row.gender.value, count=row.count)
+            for row in groups["gender"]
+        ],
+        level_of_study=entries("level_of_study"),
+        major=entries("major"),
+        race_ethnicity=[
+            StatisticEntry(label=row.race_ethnicity.value, count=row.count)
+            for row in groups["race_ethnicity"]
+        ],
+    )
+
+
+def to_entries(counts: Dict[str, int]) -> List[StatisticEntry]:
+    """
+    Convert the counts from the incrementally maintained statistics into entries, sorted by label
+    """
+    return [
+        StatisticEntry(label=label, count=count)
+        for label, count in sorted(counts.items())
+    ]
+
+
 def grouped_count(column_name: str) -> Select:
     column = getattr(Application, column_name)
     return select(column.label("label"), func.count(column)).group_by(column)
@@ -0,0 +1,43 @@
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from .projection import Projection
+from .responses import dumps
+
+# The number of rows fetched from the server-side cursor and written at a time
+BATCH_SIZE = 500
+
+
+async def stream_json(
+    db: AsyncSession, statement: Select, projection: Projection
+) -> StreamingResponse:
+    """
+    Respond with a JSON array of every row returned by the statement. Rows are fetched through a server-side cursor
+    and serialized in batches, so memory use does not grow with the number of rows. The database session must stay
+    open until the response has been sent.
+    :param db: a database session
+    :param statement: the projection's statement with any filters applied
+    :param projection: builds the response model for each row
+    """
+    result = await db.stream(statement.execution_options(yield_per=BATCH_SIZE))
+
+    async def generate() -> AsyncIterator[bytes]:
+        separator = b"["
+        try:
+            async for partition in result.mappings().partitions():
+                yield separator + b",".join(
+                    dumps(projection.build(r)) for r in partition
+                )
+                separator = b","
+        finally:
+            await result.close()
+
+        if separator == b"[":
+            yield separator
+
+        yield b"]"
+
+    return StreamingResponse(generate(), media_type="application/json")
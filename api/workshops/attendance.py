@@ -1,27 +1,22 @@
 from http import HTTPStatus
 from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response
-from opentelemetry import trace
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel
-from sqlalchemy import func, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import Select
 
 from api.helpers import require_application_accepted
 from api.permissions import Role, requires_role
 from api.session import with_user_id
-from common.database import (
-    Event,
-    EventAttendance,
-    Feedback,
-    FeedbackCreate,
-    Participant,
-    ServiceSettings,
-    SwagTier,
-    with_db,
-)
+from api.settings import SETTINGS
+from common.database import Event, EventRead, Feedback, FeedbackCreate, hot, with_db
+from common.kv import LocalCache
+from common.schedule import CHANGED, kv
+
+from .buffer import attendance_buffer
 
 router = APIRouter(
     dependencies=[
@@ -29,7 +24,12 @@ router = APIRouter(
         Depends(require_application_accepted),
     ]
 )
-tracer = trace.get_tracer(__name__)
+# Workshops by code, cleared whenever any workshop is updated or deleted
+events: LocalCache[str, EventRead] = LocalCache(
+    max_size=SETTINGS.event_cache_size,
+    ttl=SETTINGS.event_cache_ttl,
+)
+kv.subscribe(CHANGED, lambda _message: events.clear(), reset=events.clear)
 
 
 class ParticipantEvent(BaseModel):
@@ -45,7 +45,6 @@ class ParticipantEvent(BaseModel):
 )
 async def redirect(
     code: str,
-    tasks: BackgroundTasks,
     user_id: int = Depends(with_user_id),
     db: AsyncSession = Depends(with_db),
 ):
@@ -60,17 +59,8 @@ async def redirect(
         if not event.can_mark_attendance:
             raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="invalid code")
 
-        try:
-            attendance = EventAttendance(event_id=event.id, participant_id=user_id)
-
-            db.add(attendance)
-            await db.commit()
-
-            # Only update tier when attendance successfully marked
-            tasks.add_task(update_swag_tier, id=user_id, db=db)
-        except IntegrityError:
-            # Already marked attendance, all good
-            pass
+        # Already marked attendance is fine, the participant's swag tier is only updated when newly marked
+        await attendance_buffer.record(event.id, user_id)
 
     return response
 
@@ -142,54 +132,28 @@ async def submit(
         )
 
 
-async def get_event_by_code(code: str, db: AsyncSession) -> Event:
+async def get_event_by_code(code: str, db: AsyncSession) -> EventRead:
     """
-    Get an event by its code
+    Get an event by its code, from the cache if possible
     """
-    statement = select(Event).where(Event.code == code)
-    result = await db.execute(statement)
+    cached = events.get(code)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(event_by_code(code))
     event: Optional[Event] = result.scalars().first()
 
     if event is None:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="invalid code")
 
-    return event
+    cached = EventRead.from_orm(event)
+    events.set(code, cached)
 
+    return cached
 
-async def update_swag_tier(id: int, db: AsyncSession):
-    """
-    Update the participant's swag tier
-    """
-    with tracer.start_as_current_span("update-swag-tier"):
-        # Find the total number of events the participant has attended
-        events_attended_query = (
-            select(func.count())
-            .select_from(EventAttendance)
-            .where(EventAttendance.participant_id == id)
-        )
 
-        # Get the corresponding tier
-        tier_query = (
-            select(SwagTier.id)
-            .where(
-                SwagTier.required_attendance <= events_attended_query.scalar_subquery()
-            )
-            .order_by(SwagTier.required_attendance.desc())  # type: ignore
-            .limit(1)
-        )
-
-        # Update the tier on the participant
-        statement = (
-            update(Participant)
-            .where(Participant.id == id)
-            .values(swag_tier_id=tier_query.scalar_subquery())
-        )
-        await db.execute(statement)
+def event_by_code(code: str) -> Select:
+    return select(Event).where(Event.code == code)
 
-    with tracer.start_as_current_span("check-in"):
-        if await ServiceSettings.can_check_in(db):
-            await db.execute(
-                update(Participant).values(checked_in=True).where(Participant.id == id)
-            )
 
-    await db.commit()
+hot("event-by-code", event_by_code(""))
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from opentelemetry import trace
+from sqlalchemy import Boolean, Integer, bindparam, func, or_, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.future import select
+from sqlalchemy.sql import Insert, Update
+
+from common.database import (
+    Event,
+    EventAttendance,
+    Participant,
+    ServiceSettings,
+    SwagTier,
+    db_context,
+    hot,
+)
+
+# How long to wait for more scans before writing a batch, in seconds
+FLUSH_DELAY = 0.05
+
+# The most scans to write in a single batch
+MAX_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+Key = Tuple[int, int]
+
+
+class AttendanceBuffer(object):
+    """
+    Collect attendance scans from concurrent requests and write them in batches. Each batch is inserted with a single
+    statement, and the swag tiers and check-in flags of the newly attending participants are recomputed with another,
+    all in one transaction. Callers wait until their scan is committed.
+    """
+
+    def __init__(self, delay: float = FLUSH_DELAY, max_size: int = MAX_BATCH_SIZE):
+        """
+        :param delay: how long to wait for more scans before writing a batch, in seconds
+        :param max_size: the most scans to write in a single batch
+        """
+        self.delay = delay
+        self.max_size = max_size
+
+        self._pending: Dict[Key, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        # Keep references to the running flushes so they are not garbage collected
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def record(self, event_id: int, participant_id: int) -> bool:
+        """
+        Mark a participant as having attended an event
+        :param event_id: the event that was attended
+        :param participant_id: the participant who attended
+        :return: whether the attendance was newly recorded
+        """
+        key = (event_id, participant_id)
+
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+
+        if len(self._pending) >= self.max_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self.flush)
+
+        return await asyncio.shield(future)
+
+    def flush(self):
+        """
+        Start writing all the pending scans
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if len(self._pending) == 0:
+            return
+
+        batch, self._pending = self._pending, {}
+
+        task = asyncio.create_task(self.__write(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def close(self):
+        """
+        Write any pending scans and wait for all the batches to finish
+        """
+        self.flush()
+        if len(self._flushes) > 0:
+            await asyncio.wait(self._flushes)
+
+    async def __write(self, batch: Dict[Key, asyncio.Future]):
+        try:
+            with tracer.start_as_current_span("write-attendance") as span:
+                span.set_attribute("batch.size", len(batch))
+                recorded = await write(list(batch.keys()))
+        except Exception as e:
+            logger.error(f"failed to write {len(batch)} attendance records: {e}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(key in recorded)
+
+
+async def write(scans: List[Key]) -> Set[Key]:
+    """
+    Insert the attendance records and update the participants who attended a new event
+    :param scans: the event and participant of each scan
+    :return: the scans that were newly recorded
+    """
+    async with db_context() as db:
+        result = await db.execute(
+            RECORD_ATTENDANCE,
+            {
+                "event_ids": [event_id for event_id, _ in scans],
+                "participant_ids": [participant_id for _, participant_id in scans],
+            },
+        )
+        recorded = {(row.event_id, row.participant_id) for row in result.all()}
+
+        if len(recorded) > 0:
+            participant_ids = list({participant_id for _, participant_id in recorded})
+            await db.execute(
+                UPDATE_PARTICIPANTS,
+                {
+                    "participant_ids": participant_ids,
+                    "check_in": await ServiceSettings.can_check_in(db),
+                },
+            )
+
+        await db.commit()
+
+    return recorded
+
+
+def record_attendance_statement() -> Insert:
+    """
+    Insert an attendance record for each pair of event and participant, skipping any that already exist. Pairs whose
+    event or participant no longer exists are skipped too, so they cannot fail the rest of the batch.
+    """
+    scans = select(
+        func.unnest(bindparam("event_ids", [], type_=ARRAY(Integer))).label("event_id"),
+        func.unnest(bindparam("participant_ids", [], type_=ARRAY(Integer))).label(
+            "participant_id"
+        ),
+    ).subquery()
+    existing = (
+        select(scans.c.event_id, scans.c.participant_id)
+        .join(Event, Event.id == scans.c.event_id)
+        .join(Participant, Participant.id == scans.c.participant_id)
+    )
+    return (
+        insert(EventAttendance)
+        .from_select(["event_id", "participant_id"], existing)
+        .on_conflict_do_nothing()
+        .returning(EventAttendance.event_id, EventAttendance.participant_id)
+    )
+
+
+def update_participants_statement() -> Update:
+    """
+    Recompute the swag tier of each participant from the number of events they attended, and check them in if
+    requested
+    """
+    events_attended = (
+        select(func.count())
+        .select_from(EventAttendance)
+        .where(EventAttendance.participant_id == Participant.id)
+        .correlate(Participant)
+    )
+    tier = (
+        select(SwagTier.id)
+        .where(SwagTier.required_attendance <= events_attended.scalar_subquery())
+        .order_by(SwagTier.required_attendance.desc())  # type: ignore
+        .limit(1)
+    )
+
+    return (
+        update(Participant)
+        .where(
+            Participant.id
+            == func.any(bindparam("participant_ids", [], type_=ARRAY(Integer)))
+        )
+        .values(
+            swag_tier_id=tier.scalar_subquery(),
+            checked_in=or_(
+                Participant.checked_in,
+                bindparam("check_in", False, type_=Boolean),
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+RECORD_ATTENDANCE = hot("record-attendance", record_attendance_statement())
+UPDATE_PARTICIPANTS = hot(
+    "update-attended-participants", update_participants_statement()
+)
+
+attendance_buffer = AttendanceBuffer()
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
+from api.conditional import conditional
 from api.permissions import Role, requires_role
 from common.database import (
     Event,
@@ -26,7 +27,12 @@ router = APIRouter(dependencies=[Depends(requires_role(Role.Organizer))])
 tracer = trace.get_tracer(__name__)
 
 
-@router.get("/", name="List workshops", response_model=List[EventList])
+@router.get(
+    "/",
+    name="List workshops",
+    response_model=List[EventList],
+    dependencies=[Depends(conditional("events"))],
+)
 async def list(db: AsyncSession = Depends(with_db)):
     """
     Get a list of all workshops
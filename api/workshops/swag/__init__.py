@@ -6,10 +6,13 @@ from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 
 from api.helpers import require_application_accepted, with_current_participant
+from api.pagination import Pagination, with_pagination
 from api.permissions import Role, requires_role
+from api.projection import Projection
+from api.responses import trusted
+from api.streaming import stream_json
 from common.database import (
     Application,
     ApplicationStatus,
@@ -17,8 +20,10 @@ from common.database import (
     Participant,
     ParticipantRead,
     SwagTier,
+    SwagTierList,
     SwagTierListWithDescription,
     with_db,
+    with_db_readonly,
 )
 
 from . import tiers
@@ -28,6 +33,10 @@ tracer = trace.get_tracer(__name__)
 
 router.include_router(tiers.router, prefix="/tiers")
 
+PROGRESS_PROJECTION = Projection(
+    ParticipantRead, Participant, swag_tier=Projection(SwagTierList, SwagTier)
+)
+
 
 class SwagStatus(BaseModel):
     attended: int
@@ -79,16 +88,24 @@ async def progress(
     response_model=List[ParticipantRead],
     dependencies=[Depends(requires_role(Role.Organizer))],
 )
-async def participant_progresses(db: AsyncSession = Depends(with_db)):
+async def participant_progresses(
+    pagination: Pagination = Depends(with_pagination),
+    db: AsyncSession = Depends(with_db_readonly),
+):
     """
-    Get the tiers of all accepted participants
+    Get the tiers of all accepted participants. Pages are ordered by participant rather than by tier.
     """
-    result = await db.execute(
-        select(Participant)
-        .outerjoin(SwagTier)
+    statement = (
+        PROGRESS_PROJECTION.select()
         .join(Application)
         .where(Application.status == ApplicationStatus.ACCEPTED)
         .order_by(SwagTier.required_attendance, Participant.first_name)  # type: ignore
-        .options(selectinload(Participant.swag_tier))
     )
-    return result.scalars().all()
+
+    if not pagination.enabled:
+        return await stream_json(db, statement, PROGRESS_PROJECTION)
+
+    result = await db.execute(pagination.apply(statement, Participant.id))
+    participants = [PROGRESS_PROJECTION.build(row) for row in result.mappings()]
+    page = pagination.page(participants, lambda p: (p.id,))
+    return trusted(page, pagination.headers)
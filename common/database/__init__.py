@@ -1,8 +1,24 @@
+import logging
+import time
+
 from sqlalchemy.future import select
 
-from .engine import db_context, with_db
+from . import statements, versions
+from .engine import (
+    db_context,
+    db_readonly_context,
+    engine,
+    pool_statistics,
+    replica_engine,
+    with_db,
+    with_db_readonly,
+)
+from .pool import PoolStatistics
+from .statements import hot
 from .tables import *
 
+logger = logging.getLogger(__name__)
+
 
 async def healthcheck():
     """
@@ -14,8 +30,22 @@ async def healthcheck():
 
 async def warm_up():
     """
-    Warm up the mapper to prevent a slow first query
+    Warm up the mapper and prepare the hot statements on every pooled connection to prevent slow first queries
     """
+    start = time.perf_counter()
+
     async with db_context() as db:
         entry = ServiceSettings.accepting_applications(db)
         await entry.get()
+
+    registered = statements.registered()
+    primary = [s for s in registered if not s.readonly or replica_engine is engine]
+    replica = [s for s in registered if s.readonly and replica_engine is not engine]
+
+    connections = await statements.prepare(engine, primary)
+    connections += await statements.prepare(replica_engine, replica)
+
+    elapsed = (time.perf_counter() - start) * 1000
+    logger.info(
+        f"warmed up {len(registered)} statements on {connections} connections in {elapsed:.1f}ms"
+    )
@@ -1,12 +1,36 @@
 from contextlib import asynccontextmanager
-from typing import AsyncContextManager, AsyncGenerator, Callable
+from typing import AsyncContextManager, AsyncGenerator, Callable, List
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from ..settings import SETTINGS
+from .pool import InstrumentedPool, PoolStatistics
 
-engine = create_async_engine(SETTINGS.database_url, pool_pre_ping=True, future=True)
+
+def create_engine(url: str, name: str) -> AsyncEngine:
+    """
+    Create an engine using the configured connection pool
+    :param url: the database to connect to
+    :param name: how to identify the engine's connection pool
+    """
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_pre_ping=True,
+        pool_size=SETTINGS.database_pool_size,
+        max_overflow=SETTINGS.database_max_overflow,
+        pool_timeout=SETTINGS.database_pool_timeout,
+        pool_recycle=SETTINGS.database_pool_recycle,
+        connect_args={
+            "prepared_statement_cache_size": SETTINGS.database_statement_cache_size
+        },
+        pool_logging_name=name,
+        future=True,
+    )
+
+
+engine = create_engine(SETTINGS.database_url, "primary")
 SessionLocal = sessionmaker(
     engine,
     expire_on_commit=False,
@@ -16,6 +40,21 @@ SessionLocal = sessionmaker(
     future=True,
 )
 
+# Fallback to the primary when no replica is configured
+replica_engine = (
+    create_engine(SETTINGS.database_replica_url, "replica")
+    if SETTINGS.database_replica_url is not None
+    else engine
+)
+ReadOnlySessionLocal = sessionmaker(
+    replica_engine.execution_options(postgresql_readonly=True),
+    expire_on_commit=False,
+    autoflush=False,
+    autocommit=False,
+    class_=AsyncSession,
+    future=True,
+)
+
 
 async def with_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -29,8 +68,39 @@ async def with_db() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
+async def with_db_readonly() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Open a read-only database session from the read replica's connection pool, or the primary's if there is no
+    replica. Data may lag slightly behind the primary.
+    :return: a read-only database session
+    """
+    try:
+        async with ReadOnlySessionLocal() as session:
+            yield session
+    finally:
+        await session.close()
+
+
 # Required since FastAPI cannot use context managers as dependencies
 # Relevant issue: https://github.com/tiangolo/fastapi/issues/2212
 db_context: Callable[[], AsyncContextManager[AsyncSession]] = asynccontextmanager(
     with_db
 )
+db_readonly_context: Callable[
+    [], AsyncContextManager[AsyncSession]
+] = asynccontextmanager(with_db_readonly)
+
+
+def pool_statistics() -> List[PoolStatistics]:
+    """
+    Get the usage of each connection pool in the current process
+    """
+    engines = [engine] if replica_engine is engine else [engine, replica_engine]
+
+    statistics = []
+    for e in engines:
+        pool = e.sync_engine.pool
+        assert isinstance(pool, InstrumentedPool)
+        statistics.append(pool.statistics())
+
+    return statistics
@@ -0,0 +1,41 @@
+"""add indexes for hot lookups
+
+Revision ID: 3f9a2c81d4b7
+Revises: ed2fee02e591
+Create Date: 2026-10-18 17:20:41.318205+00:00
+
+"""
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3f9a2c81d4b7"
+down_revision = "ed2fee02e591"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("participants_email_idx", "participants", ["email"])
+    op.create_index("participants_project_code_idx", "participants", ["project_code"])
+    op.create_index(
+        "participants_checked_in_idx",
+        "participants",
+        ["id"],
+        postgresql_where=sa.text("checked_in"),
+    )
+
+    op.create_index("applications_status_idx", "applications", ["status"])
+    op.create_index(
+        "applications_created_at_idx", "applications", ["created_at", "participant_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("applications_created_at_idx")
+    op.drop_index("applications_status_idx")
+
+    op.drop_index("participants_checked_in_idx")
+    op.drop_index("participants_project_code_idx")
+    op.drop_index("participants_email_idx")
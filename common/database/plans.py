@@ -0,0 +1,132 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import ClauseElement, Executable
+
+from .tables import (
+    Application,
+    ApplicationStatus,
+    Gender,
+    Participant,
+    RaceEthnicity,
+    School,
+)
+
+SEED_SCHOOL = "query-plan-check"
+
+
+class Explain(Executable, ClauseElement):
+    """
+    Get the query plan for a statement without executing it
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Executable):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element: Explain, compiler, **kwargs) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kwargs)
+
+
+async def sequential_scans(
+    connection: AsyncConnection, statement: Executable, threshold: int
+) -> List[str]:
+    """
+    Find the tables a statement reads sequentially that are larger than the threshold
+    :param connection: the connection to plan the statement on
+    :param statement: the statement to check
+    :param threshold: the number of rows a table can have before sequentially scanning it is a problem
+    :return: the names of the offending tables
+    """
+    result = await connection.execute(Explain(statement))
+    plan = result.scalar_one()
+
+    relations = [
+        node["Relation Name"]
+        for node in walk(plan[0]["Plan"])
+        if node["Node Type"] == "Seq Scan"
+    ]
+    if len(relations) == 0:
+        return []
+
+    result = await connection.execute(
+        text("SELECT relname, reltuples FROM pg_class WHERE relname = ANY(:names)"),
+        {"names": relations},
+    )
+    sizes = dict(result.all())
+
+    return [r for r in relations if sizes.get(r, 0) > threshold]
+
+
+def walk(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over every node in a query plan
+    """
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+async def seed(connection: AsyncConnection, rows: int):
+    """
+    Insert synthetic participants and applications so the planner has realistic statistics to work with. This is
+    intended to be run within a transaction that gets rolled back.
+    :param connection: the connection to insert with
+    :param rows: the number of participants to create
+    """
+    await connection.execute(
+        School.__table__.insert().values(  # type: ignore
+            id=SEED_SCHOOL, name="Query Plan Check University"
+        )
+    )
+
+    result = await connection.execute(
+        Participant.__table__.insert().returning(Participant.id),  # type: ignore
+        [
+            {
+                "first_name": "Plan",
+                "last_name": f"Check {i}",
+                "email": f"plan-check-{i}@example.com",
+                "checked_in": i % 20 == 0,
+                "project_code": f"{i:07x}",
+            }
+            for i in range(rows)
+        ],
+    )
+    ids = result.scalars().all()
+
+    statuses = list(ApplicationStatus)
+    created_at = datetime.now()
+
+    # Leave some participants without an application
+    await connection.execute(
+        Application.__table__.insert(),  # type: ignore
+        [
+            {
+                "participant_id": id,
+                "level_of_study": "Undergraduate",
+                "graduation_year": 2025,
+                "hackathons_attended": 0,
+                "gender": Gender.OTHER,
+                "date_of_birth": date(2000, 1, 1),
+                "race_ethnicity": RaceEthnicity.MULTIPLE_OTHER,
+                "country": "US",
+                "phone_number": "+1 555-555-5555",
+                "share_information": i % 2 == 0,
+                "legal_agreements_acknowledged": True,
+                "status": statuses[i % len(statuses)],
+                "school_id": SEED_SCHOOL,
+                "created_at": created_at - timedelta(minutes=i),
+            }
+            for i, id in enumerate(ids)
+            if i % 4 != 0
+        ],
+    )
+
+    await connection.execute(text("ANALYZE participants, applications, schools"))
@@ -0,0 +1,72 @@
+import os
+import time
+
+from pydantic import BaseModel
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolStatistics(BaseModel):
+    """
+    The connection pool usage of the current process
+    """
+
+    pid: int
+    name: str
+
+    size: int
+    checked_in: int
+    checked_out: int
+    # The number of connections open beyond the pool size
+    overflow: int
+
+    # Totals since the pool was created, wait times are in seconds and include the pre-ping
+    checkouts: int
+    timeouts: int
+    total_wait: float
+    max_wait: float
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    A connection pool that records how long callers wait to check out a connection
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+
+        try:
+            return super().connect()
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def statistics(self) -> PoolStatistics:
+        """
+        Get a snapshot of the pool's usage
+        """
+        return PoolStatistics(
+            pid=os.getpid(),
+            name=getattr(self, "logging_name", "default"),
+            size=self.size(),
+            checked_in=self.checkedin(),
+            checked_out=self.checkedout(),
+            overflow=max(self.overflow(), 0),
+            checkouts=self.checkouts,
+            timeouts=self.timeouts,
+            total_wait=self.total_wait,
+            max_wait=self.max_wait,
+        )
@@ -0,0 +1,86 @@
+import logging
+from contextlib import AsyncExitStack
+from typing import Dict, List, NamedTuple, TypeVar
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.sql import Executable, Select
+
+S = TypeVar("S", bound=Executable)
+
+logger = logging.getLogger(__name__)
+
+
+class HotStatement(NamedTuple):
+    name: str
+    statement: Executable
+
+    # Whether the statement is executed against the read replica
+    readonly: bool
+
+    # Whether the statement is expected to read entire tables, exempting it from the query plan checks
+    full_scan: bool
+
+
+_registry: Dict[str, HotStatement] = {}
+
+
+def hot(name: str, statement: S, readonly: bool = False, full_scan: bool = False) -> S:
+    """
+    Register a frequently executed statement so it gets compiled and prepared on every pooled connection when warming
+    up. Only the structure of the statement matters, so any parameter values can be used.
+    :param name: a unique name for the statement
+    :param statement: the statement to register
+    :param readonly: whether the statement is executed against the read replica
+    :param full_scan: whether the statement is expected to read entire tables
+    :return: the registered statement
+    """
+    _registry[name] = HotStatement(name, statement, readonly, full_scan)
+    return statement
+
+
+def registered() -> List[HotStatement]:
+    """
+    Get all the registered hot statements
+    """
+    return list(_registry.values())
+
+
+async def prepare(engine: AsyncEngine, statements: List[HotStatement]) -> int:
+    """
+    Compile and prepare the statements on every connection in the engine's pool. Statements are executed within a
+    transaction that is always rolled back, and rows are never fetched.
+    :param engine: the engine to prepare the statements for
+    :param statements: the statements to prepare
+    :return: the number of connections the statements were prepared on
+    """
+    if len(statements) == 0:
+        return 0
+
+    async with AsyncExitStack() as stack:
+        # Hold all the connections at once to ensure each pooled connection gets used
+        connections = [
+            await stack.enter_async_context(engine.connect())
+            for _ in range(engine.sync_engine.pool.size())  # type: ignore
+        ]
+
+        for connection in connections:
+            for hot_statement in statements:
+                try:
+                    await run(connection, hot_statement.statement)
+                except DBAPIError as e:
+                    logger.warning(f"failed to prepare {hot_statement.name!r}: {e}")
+                    await connection.rollback()
+
+    return len(connections)
+
+
+async def run(connection: AsyncConnection, statement: Executable):
+    """
+    Execute a statement without retrieving any of its rows
+    """
+    if isinstance(statement, Select):
+        result = await connection.stream(statement)
+        await result.close()
+    else:
+        await connection.execute(statement)
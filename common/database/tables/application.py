@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING, Any, Dict, Optional
 from pydantic import BaseModel, validator
 from sqlalchemy import Column
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, Integer
+from sqlalchemy import ForeignKey, Index, Integer
 from sqlmodel import Field, Relationship, SQLModel
 
 from .types import TimeStamp
@@ -118,6 +118,10 @@ class ApplicationBase(ApplicationProfileBase):
 
 class Application(ApplicationBase, table=True):
     __tablename__ = "applications"
+    __table_args__ = (
+        Index("applications_status_idx", "status"),
+        Index("applications_created_at_idx", "created_at", "participant_id"),
+    )
 
     participant_id: int = Field(
         sa_column=Column(
@@ -49,21 +49,6 @@ class EventBase(SQLModel):
 
         return values
 
-
-class Event(EventBase, table=True):
-    __tablename__ = "events"
-
-    id: Optional[int] = Field(default=None, primary_key=True, nullable=False)
-
-    attendees: List["Participant"] = Relationship(
-        back_populates="attended",
-        link_model=EventAttendance,
-    )
-    feedback: List["Feedback"] = Relationship(
-        back_populates="event",
-        sa_relationship_kwargs={"cascade": "all, delete, delete-orphan"},
-    )
-
     @property
     def can_mark_attendance(self) -> bool:
         """
@@ -84,6 +69,21 @@ class Event(EventBase, table=True):
         return self.enabled and self.valid_from <= datetime.now(tz=pytz.utc)
 
 
+class Event(EventBase, table=True):
+    __tablename__ = "events"
+
+    id: Optional[int] = Field(default=None, primary_key=True, nullable=False)
+
+    attendees: List["Participant"] = Relationship(
+        back_populates="attended",
+        link_model=EventAttendance,
+    )
+    feedback: List["Feedback"] = Relationship(
+        back_populates="event",
+        sa_relationship_kwargs={"cascade": "all, delete, delete-orphan"},
+    )
+
+
 class EventCreate(SQLModel):
     name: str
     link: Optional[str]
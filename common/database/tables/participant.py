@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING, List, Optional
 from pydantic import EmailStr
 from sqlalchemy import Column
 from sqlalchemy import Enum as SqlEnum
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
 from .event_attendance import EventAttendance
@@ -47,6 +48,11 @@ class ParticipantBase(SQLModel):
 
 class Participant(ParticipantBase, table=True):
     __tablename__ = "participants"
+    __table_args__ = (
+        Index("participants_email_idx", "email"),
+        Index("participants_project_code_idx", "project_code"),
+        Index("participants_checked_in_idx", "id", postgresql_where=text("checked_in")),
+    )
 
     id: int = Field(default=None, primary_key=True, nullable=False)
 
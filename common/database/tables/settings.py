@@ -1,17 +1,29 @@
 import json
+import logging
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Generic, Type, TypeVar
+from typing import Any, Dict, Generic, Type, TypeVar
 
 from pydantic.json import pydantic_encoder
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import func, or_
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
 from sqlmodel import Field, SQLModel
 
+from ...kv import engine
+
+logger = logging.getLogger(__name__)
+
+kv = engine.namespaced("settings")
+
+# Marks a database session as having modified a setting
+CHANGED = "settings-changed"
+
 
 class Key(Enum):
     ACCEPTING_APPLICATIONS = "accepting_applications"
@@ -79,10 +91,8 @@ class Entry(Generic[T]):
         self.formatter = formatter
 
     async def get(self) -> T:
-        setting = await self.db.get(Settings, self.key)
-        assert setting is not None
-
-        return self.formatter.decode(setting.value)  # type: ignore
+        raw = await cache.get(self.db, self.key)
+        return self.formatter.decode(raw)  # type: ignore
 
     async def set(self, value: T):
         setting = await self.db.get(Settings, self.key)
@@ -90,6 +100,79 @@ class Entry(Generic[T]):
 
         setting.value = self.formatter.encode(value)  # type: ignore
 
+        # Other processes are notified once the change is committed
+        self.db.info[CHANGED] = True
+
+
+class Cache(object):
+    """
+    An in-process copy of every setting. All the settings are loaded at once on first use and reloaded after any of
+    them change. Changes are propagated to every process through pub/sub once they are committed.
+    """
+
+    def __init__(self):
+        self._values: Dict[Key, str] = {}
+
+        self._loaded = False
+
+        # Incremented on every invalidation so a load racing with a change is not kept
+        self._generation = 0
+
+        kv.subscribe("changed", self.__on_message, reset=self.invalidate)
+
+    async def get(self, db: AsyncSession, key: Key) -> str:
+        """
+        Get the raw value of a setting
+        :param db: a database session to load the settings with if needed
+        :param key: the setting to get
+        """
+        if not self._loaded:
+            await self.__load(db)
+
+        return self._values[key]
+
+    def invalidate(self):
+        """
+        Force the settings to be reloaded on next access
+        """
+        self._generation += 1
+        self._loaded = False
+
+    def __on_message(self, _message: str):
+        self.invalidate()
+
+    async def __load(self, db: AsyncSession):
+        """
+        Replace the local copy with the current settings
+        """
+        generation = self._generation
+
+        result = await db.execute(select(Settings.key, Settings.value))
+        self._values = {key: value for key, value in result.all()}
+
+        self._loaded = generation == self._generation
+
+
+cache = Cache()
+
+
+@event.listens_for(Session, "after_commit")
+def on_commit(session: Session):
+    if session.info.pop(CHANGED, False):
+        cache.invalidate()
+
+        # Commits on async sessions run within a greenlet, so the publish can be awaited. The commit already
+        # succeeded, so a failure must not fail the request, other processes reload once their subscriptions reconnect.
+        try:
+            await_only(kv.publish("changed", "1"))
+        except Exception as e:
+            logger.error(f"failed to announce settings change: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def on_rollback(session: Session):
+    session.info.pop(CHANGED, None)
+
 
 class Settings(SQLModel, table=True):
     __tablename__ = "settings"
@@ -111,18 +194,12 @@ class Settings(SQLModel, table=True):
 
     @staticmethod
     async def can_check_in(db: AsyncSession) -> bool:
-        result = await db.execute(
-            select(
-                func.bit_xor(
-                    func.bit_bool(
-                        Settings.value.cast(DateTime(timezone=True)) > func.now()  # type: ignore
-                    )
-                )
-            ).where(
-                or_(Settings.key == Key.CHECKIN_START, Settings.key == Key.CHECKIN_END)
-            )
-        )
-        return bool(result.scalars().first().to_int())  # type: ignore
+        start = await Settings.checkin_start(db).get()
+        end = await Settings.checkin_end(db).get()
+
+        # Check-in is open when exactly one of the bounds is still in the future
+        now = datetime.now(timezone.utc)
+        return (start > now) != (end > now)
 
 
 class SettingsRead(SQLModel):
@@ -0,0 +1,84 @@
+import logging
+import secrets
+from typing import List, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, object_mapper
+from sqlalchemy.util import await_only
+
+from ..kv import engine
+
+logger = logging.getLogger(__name__)
+
+kv = engine.namespaced("table-versions")
+
+# A hash of table name to the number of committed transactions that wrote to it
+VERSIONS = "versions"
+
+# Identifies the current set of counters, changing whenever they are lost so old versions are never reused
+EPOCH = "epoch"
+
+# The tables written to by the session's current transaction
+CHANGED = "versions-changed"
+
+
+async def bump(*tables: str):
+    """
+    Record that the contents of tables changed. Tables are identified by name, but any key can be used for data that
+    is not stored in the database.
+    :param tables: the tables that changed
+    """
+    if len(tables) == 0:
+        return
+
+    async with kv.pipeline() as pipeline:
+        for table in tables:
+            pipeline.hincrby(VERSIONS, table, 1)
+
+
+async def get(*tables: str) -> List[str]:
+    """
+    Get the current version of each table, prefixed with the counters' epoch
+    :param tables: the tables to get the versions of
+    """
+    versions = await kv.hgetall(VERSIONS)
+
+    epoch = versions.get(EPOCH)
+    if epoch is None:
+        epoch = secrets.token_hex(8)
+        await kv.hset(VERSIONS, {EPOCH: epoch})
+
+    return [epoch] + [versions.get(table, "0") for table in tables]
+
+
+def changed(session: Session) -> Set[str]:
+    return session.info.setdefault(CHANGED, set())
+
+
+@event.listens_for(Session, "after_flush")
+def on_flush(session: Session, _context):
+    for instance in session.new | session.dirty | session.deleted:
+        changed(session).update(t.name for t in object_mapper(instance).tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def on_execute(state: ORMExecuteState):
+    if state.is_insert or state.is_update or state.is_delete:
+        changed(state.session).add(state.statement.table.name)  # type: ignore
+
+
+@event.listens_for(Session, "after_commit")
+def on_commit(session: Session):
+    tables = session.info.pop(CHANGED, None)
+    if tables:
+        # Commits on async sessions run within a greenlet, so the bump can be awaited. The commit already succeeded,
+        # so a failure must not fail the request, clients only keep their cached copies until the next write.
+        try:
+            await_only(bump(*tables))
+        except Exception as e:
+            logger.exception(f"failed to bump versions of {sorted(tables)}: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def on_rollback(session: Session):
+    session.info.pop(CHANGED, None)
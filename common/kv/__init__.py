@@ -3,10 +3,16 @@ from types import ModuleType
 from typing import Callable, Optional, cast
 
 from ..settings import SETTINGS
-from .engine import Engine, NamespacedClient
+from . import codecs
+from .cache import LocalCache
+from .codecs import Codec
+from .engine import Engine, NamespacedClient, NamespacedPipeline
 
 engine = Engine(SETTINGS.redis_url)
 
+# The codec for namespaces with large or frequently accessed values
+compact = codecs.create(SETTINGS.kv_format, SETTINGS.kv_compression_threshold)
+
 
 async def healthcheck():
     """
@@ -15,10 +21,27 @@ async def healthcheck():
     await engine.client().ping()
 
 
-def with_kv(namespace: Optional[str] = None) -> Callable[[], NamespacedClient]:
+def listen():
+    """
+    Start delivering published messages to subscribers in the background
+    """
+    engine.listen()
+
+
+async def close():
+    """
+    Stop delivering published messages to subscribers
+    """
+    await engine.close()
+
+
+def with_kv(
+    namespace: Optional[str] = None, codec: Optional[Codec] = None
+) -> Callable[[], NamespacedClient]:
     """
     Open a Redis connection from the connection pool
     :param namespace: an optional namespace, defaults to the caller's module
+    :param codec: how to serialize non-string values, defaults to JSON
     :return: a redis connection
     """
 
@@ -30,4 +53,4 @@ def with_kv(namespace: Optional[str] = None) -> Callable[[], NamespacedClient]:
         assert module is not None
         namespace = cast(ModuleType, module).__name__
 
-    return lambda: engine.namespaced(cast(str, namespace))
+    return lambda: engine.namespaced(cast(str, namespace), codec)
@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LocalCache(Generic[K, V]):
+    """
+    A bounded, in-process cache whose entries expire after a fixed duration. The least recently used entries are
+    evicted first once the cache is full.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        :param max_size: the maximum number of entries to keep, 0 disables the cache
+        :param ttl: how long an entry is valid for in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Get a value from the cache if it exists and has not expired
+        :param key: the key to lookup
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V):
+        """
+        Add a value to the cache, evicting the least recently used entries if needed
+        :param key: the key to store the value at
+        :param value: the value to store
+        """
+        if self.max_size <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K):
+        """
+        Remove a value from the cache
+        :param key: the key to remove
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all the values from the cache
+        """
+        self._entries.clear()
@@ -0,0 +1,133 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+import orjson
+from pydantic.json import pydantic_encoder
+
+from ..settings import KVFormat
+
+# Import the optional serialization libraries if available, the codecs using them will refuse to be created otherwise.
+# They are installed with the `msgpack` and `zstd` extras.
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# The version byte prefixed to every binary-encoded value. Legacy JSON values are never prefixed, and since they are
+# always valid UTF-8 text, they will never start with one of these bytes.
+ORJSON = 0x01
+MSGPACK = 0x02
+ZSTD_MSGPACK = 0x03
+
+VERSIONS = {ORJSON, MSGPACK, ZSTD_MSGPACK}
+
+
+class Codec(ABC):
+    """
+    Converts structured values to and from their stored representation
+    """
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes:
+        """
+        Serialize a value for storage
+        :param value: the value to serialize
+        """
+
+
+class JsonCodec(Codec):
+    """
+    Plain JSON text, the original storage format
+    """
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=pydantic_encoder).encode("utf-8")
+
+
+class OrJsonCodec(Codec):
+    """
+    JSON serialized with orjson
+    """
+
+    def encode(self, value: Any) -> bytes:
+        return bytes([ORJSON]) + orjson.dumps(value, default=pydantic_encoder)
+
+
+class MsgPackCodec(Codec):
+    """
+    MessagePack, optionally compressed with zstd once the value exceeds a size threshold
+    """
+
+    def __init__(self, compress_above: Optional[int] = None):
+        """
+        :param compress_above: the size in bytes after which values are compressed, None disables compression
+        """
+        require(msgpack, "msgpack")
+        if compress_above is not None:
+            require(zstandard, "zstandard")
+
+        self.compress_above = compress_above
+
+    def encode(self, value: Any) -> bytes:
+        packed = msgpack.packb(value, default=pydantic_encoder)
+        if self.compress_above is None or len(packed) <= self.compress_above:
+            return bytes([MSGPACK]) + packed
+
+        return bytes([ZSTD_MSGPACK]) + zstandard.compress(packed)
+
+
+def create(format: KVFormat, compression_threshold: int) -> Codec:
+    """
+    Create the codec for a format
+    :param format: the serialization format
+    :param compression_threshold: the size in bytes after which values are compressed, if supported
+    """
+    if format == KVFormat.OrJson:
+        return OrJsonCodec()
+    elif format == KVFormat.MsgPack:
+        return MsgPackCodec()
+    elif format == KVFormat.ZstdMsgPack:
+        return MsgPackCodec(compress_above=compression_threshold)
+
+    return JsonCodec()
+
+
+def is_versioned(raw: bytes) -> bool:
+    """
+    Check if a stored value was written by one of the binary codecs
+    """
+    return len(raw) > 0 and raw[0] in VERSIONS
+
+
+def decode(raw: bytes) -> Any:
+    """
+    Deserialize a stored value written by any of the codecs, the format is determined from its version byte
+    :param raw: the stored value
+    """
+    if not is_versioned(raw):
+        return json.loads(raw)
+
+    version, payload = raw[0], raw[1:]
+    if version == ORJSON:
+        return orjson.loads(payload)
+
+    require(msgpack, "msgpack")
+    if version == ZSTD_MSGPACK:
+        require(zstandard, "zstandard")
+        payload = zstandard.decompress(payload)
+
+    return msgpack.unpackb(payload)
+
+
+def require(module: Any, name: str):
+    if module is None:
+        raise RuntimeError(
+            f"the {name} package is required to use this codec, install it with the matching extra"
+        )
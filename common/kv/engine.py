@@ -1,11 +1,40 @@
+import asyncio
+import inspect
 import json
-from typing import Any, Optional
+import logging
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from pydantic.json import pydantic_encoder
 from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ConnectionError
+
+from . import codecs
+from .codecs import Codec, JsonCodec
+
+logger = logging.getLogger(__name__)
 
 GLOBAL_PREFIX = "application-portal"
 
+# How long to wait before re-subscribing after the connection is lost
+RECONNECT_DELAY = 1
+
+MessageHandler = Callable[[str], Union[None, Awaitable[None]]]
+ResetHandler = Callable[[], Union[None, Awaitable[None]]]
+
 
 class Engine(object):
     """
@@ -15,6 +44,9 @@ class Engine(object):
     def __init__(self, url: str):
         self._pool = ConnectionPool.from_url(url, max_connections=10)
 
+        self._subscribers: Dict[str, List[Tuple[MessageHandler, ResetHandler]]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
     def client(self) -> Redis:
         """
         Get a raw Redis client from the engine
@@ -23,12 +55,101 @@ class Engine(object):
             connection_pool=self._pool, encoding="utf-8", decode_responses=True
         )
 
-    def namespaced(self, prefix: str) -> "NamespacedClient":
+    def namespaced(
+        self, prefix: str, codec: Optional[Codec] = None
+    ) -> "NamespacedClient":
         """
         Get a namespaced Redis client wrapper
         :param prefix: the prefix for every key
+        :param codec: how to serialize non-string values, defaults to JSON
+        """
+        return NamespacedClient(self, f"{GLOBAL_PREFIX}:{prefix}", codec or JsonCodec())
+
+    def subscribe(
+        self,
+        channel: str,
+        handler: MessageHandler,
+        reset: Optional[ResetHandler] = None,
+    ):
+        """
+        Register a handler for messages published to a channel. Handlers must be registered before listening starts.
+        :param channel: the channel to receive messages from
+        :param handler: called with each message published to the channel
+        :param reset: called whenever messages may have been missed, i.e. after reconnecting
+        """
+        self._subscribers.setdefault(channel, []).append(
+            (handler, reset or (lambda: None))
+        )
+
+    async def publish(self, channel: str, message: str):
+        """
+        Publish a message to every subscriber of a channel
+        :param channel: the channel to publish to
+        :param message: the message to send
+        """
+        await self.client().publish(channel, message)
+
+    def listen(self):
+        """
+        Start dispatching published messages to the registered handlers in the background
         """
-        return NamespacedClient(self._pool, f"{GLOBAL_PREFIX}:{prefix}")
+        if self._listener is None and self._subscribers:
+            self._listener = asyncio.create_task(self.__dispatch())
+
+    async def close(self):
+        """
+        Stop dispatching published messages and close all the connections
+        """
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+        await self._pool.disconnect()
+
+    async def __dispatch(self):
+        while True:
+            try:
+                async with self.client().pubsub(
+                    ignore_subscribe_messages=True
+                ) as pubsub:
+                    await pubsub.subscribe(*self._subscribers.keys())
+
+                    # Anything published while we were disconnected was lost
+                    for _, reset in self.__all_subscribers():
+                        await call(reset)
+
+                    async for message in pubsub.listen():
+                        channel = message["channel"].decode("utf-8")
+                        data = message["data"].decode("utf-8")
+
+                        for handler, _ in self._subscribers.get(channel, []):
+                            await call(handler, data)
+
+            except ConnectionError as e:
+                logger.warning(f"lost pub/sub connection: {e}")
+            except Exception as e:
+                logger.exception(f"pub/sub listener failed: {e}")
+
+            # Messages may be missed until the subscription is re-established
+            for _, reset in self.__all_subscribers():
+                await call(reset)
+
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def __all_subscribers(self) -> List[Tuple[MessageHandler, ResetHandler]]:
+        return [s for subscribers in self._subscribers.values() for s in subscribers]
+
+
+async def call(handler: Callable[..., Union[None, Awaitable[None]]], *args: Any):
+    """
+    Call a handler that may or may not be a coroutine function
+    """
+    try:
+        result = handler(*args)
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.exception(f"pub/sub handler failed: {e}")
 
 
 class NamespacedClient(object):
@@ -36,11 +157,11 @@ class NamespacedClient(object):
     A Redis client that has all keys prefixed with a value
     """
 
-    def __init__(self, pool: ConnectionPool, prefix: str):
-        self._client: Redis = Redis(
-            connection_pool=pool, encoding="utf-8", decode_responses=True
-        )
+    def __init__(self, engine: Engine, prefix: str, codec: Codec):
+        self._engine = engine
+        self._client: Redis = engine.client()
         self._prefix = prefix
+        self._codec = codec
 
     def __format_key(self, key: str) -> str:
         return f"{self._prefix}:{key}"
@@ -52,13 +173,23 @@ class NamespacedClient(object):
         :param is_json: whether to decode the response as JSON
         """
         value = await self._client.get(self.__format_key(key))
-        if value is None:
-            return None
+        return decode(value, is_json)
 
-        if is_json:
-            return json.loads(value)
-        else:
-            return value.decode("utf-8")
+    async def mget(
+        self, keys: Iterable[str], *, is_json: bool = False
+    ) -> List[Optional[Any]]:
+        """
+        Get multiple values from Redis at once
+        :param keys: the keys to read from
+        :param is_json: whether to decode the responses as JSON
+        :return: the values in the same order as the keys, missing values are None
+        """
+        formatted = [self.__format_key(key) for key in keys]
+        if len(formatted) == 0:
+            return []
+
+        values = await self._client.mget(formatted)
+        return [decode(value, is_json) for value in values]
 
     async def set(self, key: str, value: Any, expires_in: Optional[int] = None):
         """
@@ -67,13 +198,44 @@ class NamespacedClient(object):
         :param value: the value to store
         :param expires_in: when the value should expire
         """
-        if not isinstance(value, str):
-            value = json.dumps(value, default=pydantic_encoder)
-
         if expires_in is None:
-            await self._client.set(self.__format_key(key), value)
+            await self._client.set(self.__format_key(key), encode(value, self._codec))
         else:
-            await self._client.setex(self.__format_key(key), expires_in, value)
+            await self._client.setex(
+                self.__format_key(key), expires_in, encode(value, self._codec)
+            )
+
+    async def set_if_missing(
+        self, key: str, value: Any, expires_in: Optional[int] = None
+    ) -> bool:
+        """
+        Set a value in Redis only if the key does not exist yet. If the value is not a string, it will be converted to
+        JSON
+        :param key: the key to store the value at
+        :param value: the value to store
+        :param expires_in: when the value should expire
+        :return: whether the value was set
+        """
+        result = await self._client.set(
+            self.__format_key(key),
+            encode(value, self._codec),
+            ex=expires_in,
+            nx=True,
+        )
+        return bool(result)
+
+    async def mset(self, values: Mapping[str, Any], expires_in: Optional[int] = None):
+        """
+        Set multiple values in Redis at once. Any values that are not strings will be converted to JSON
+        :param values: the keys and the values to store at them
+        :param expires_in: when the values should expire
+        """
+        if len(values) == 0:
+            return
+
+        async with self.pipeline() as pipeline:
+            for key, value in values.items():
+                pipeline.set(key, value, expires_in)
 
     async def delete(self, key: str):
         """
@@ -81,3 +243,328 @@ class NamespacedClient(object):
         :param key: the key to delete
         """
         await self._client.delete(self.__format_key(key))
+
+    async def delete_many(self, keys: Iterable[str]):
+        """
+        Delete multiple values from Redis at once
+        :param keys: the keys to delete
+        """
+        formatted = [self.__format_key(key) for key in keys]
+        if len(formatted) > 0:
+            await self._client.delete(*formatted)
+
+    async def hget(
+        self, key: str, field: str, *, is_json: bool = False
+    ) -> Optional[Any]:
+        """
+        Get a field from a hash
+        :param key: the hash to read from
+        :param field: the field to read
+        :param is_json: whether to decode the response as JSON
+        """
+        value = await self._client.hget(self.__format_key(key), field)
+        return decode(value, is_json)
+
+    async def hgetall(self, key: str, *, is_json: bool = False) -> Dict[str, Any]:
+        """
+        Get all the fields of a hash
+        :param key: the hash to read from
+        :param is_json: whether to decode the values as JSON
+        """
+        values = await self._client.hgetall(self.__format_key(key))
+        return decode_hash(values, is_json)
+
+    async def hset(self, key: str, values: Mapping[str, Any]):
+        """
+        Set fields in a hash. Any values that are not strings will be converted to JSON
+        :param key: the hash to store the fields in
+        :param values: the fields and their values
+        """
+        if len(values) > 0:
+            await self._client.hset(
+                self.__format_key(key), mapping=encode_hash(values, self._codec)
+            )
+
+    async def hdel(self, key: str, *fields: str):
+        """
+        Delete fields from a hash
+        :param key: the hash to delete from
+        :param fields: the fields to delete
+        """
+        if len(fields) > 0:
+            await self._client.hdel(self.__format_key(key), *fields)
+
+    async def expire(self, key: str, expires_in: int):
+        """
+        Set when a key should expire
+        :param key: the key to expire
+        :param expires_in: the number of seconds until the key expires
+        """
+        await self._client.expire(self.__format_key(key), expires_in)
+
+    async def exists(self, key: str) -> bool:
+        """
+        Check if a key exists
+        :param key: the key to check
+        """
+        return await self._client.exists(self.__format_key(key)) == 1
+
+    async def getbit(self, key: str, offset: int) -> bool:
+        """
+        Get a bit from a bitmap
+        :param key: the bitmap to read from
+        :param offset: the bit to read
+        """
+        return await self._client.getbit(self.__format_key(key), offset) == 1
+
+    async def setbit(self, key: str, offset: int, value: bool):
+        """
+        Set a bit in a bitmap
+        :param key: the bitmap to write to
+        :param offset: the bit to write
+        :param value: the bit's new value
+        """
+        await self._client.setbit(self.__format_key(key), offset, int(value))
+
+    async def zadd(self, key: str, mapping: Mapping[str, float]):
+        """
+        Add members to a sorted set, updating the scores of existing members
+        :param key: the sorted set to add to
+        :param mapping: the members and their scores
+        """
+        await self._client.zadd(self.__format_key(key), mapping)  # type: ignore
+
+    async def zrangebyscore(
+        self, key: str, min: Union[float, str], max: Union[float, str]
+    ) -> List[Tuple[str, float]]:
+        """
+        Get the members of a sorted set, and their scores, whose score is within the range
+        :param key: the sorted set to read from
+        :param min: the inclusive minimum score
+        :param max: the inclusive maximum score
+        """
+        members = await self._client.zrangebyscore(
+            self.__format_key(key), min, max, withscores=True
+        )
+        return decode_scores(members)
+
+    async def zremrangebyscore(
+        self, key: str, min: Union[float, str], max: Union[float, str]
+    ):
+        """
+        Remove the members of a sorted set whose score is within the range
+        :param key: the sorted set to remove from
+        :param min: the inclusive minimum score
+        :param max: the inclusive maximum score
+        """
+        await self._client.zremrangebyscore(self.__format_key(key), min, max)
+
+    async def eval(self, script: str, keys: Sequence[str], args: Sequence[Any]) -> Any:
+        """
+        Run a Lua script atomically
+        :param script: the script's source
+        :param keys: the keys the script accesses, available as KEYS
+        :param args: any other arguments, available as ARGV
+        :return: the script's result, with any strings decoded
+        """
+        formatted = [self.__format_key(key) for key in keys]
+        result = await self._client.eval(script, len(formatted), *formatted, *args)
+        return decode_reply(result)
+
+    async def publish(self, channel: str, message: str):
+        """
+        Publish a message to every subscriber of a namespaced channel
+        :param channel: the channel to publish to
+        :param message: the message to send
+        """
+        await self._engine.publish(self.__format_key(channel), message)
+
+    def subscribe(
+        self,
+        channel: str,
+        handler: MessageHandler,
+        reset: Optional[ResetHandler] = None,
+    ):
+        """
+        Register a handler for messages published to a namespaced channel
+        :param channel: the channel to receive messages from
+        :param handler: called with each message published to the channel
+        :param reset: called whenever messages may have been missed, i.e. after reconnecting
+        """
+        self._engine.subscribe(self.__format_key(channel), handler, reset)
+
+    @asynccontextmanager
+    async def pipeline(
+        self, transaction: bool = False
+    ) -> AsyncIterator["NamespacedPipeline"]:
+        """
+        Queue up multiple commands to send in a single round trip. The commands are sent when the context exits,
+        after which the decoded results are available from the pipeline.
+        :param transaction: whether to execute the commands atomically
+        """
+        async with self._client.pipeline(transaction=transaction) as raw:
+            pipeline = NamespacedPipeline(raw, self._prefix, self._codec)
+            yield pipeline
+            await pipeline.execute()
+
+
+class NamespacedPipeline(object):
+    """
+    A Redis pipeline that has all keys prefixed with a value. Supports the same commands as the namespaced client,
+    but they are queued until the pipeline is executed.
+    """
+
+    def __init__(self, pipeline: Pipeline, prefix: str, codec: Codec):
+        self._pipeline = pipeline
+        self._prefix = prefix
+        self._codec = codec
+
+        self._decoders: List[Callable[[Any], Any]] = []
+        self.results: List[Any] = []
+
+    def __format_key(self, key: str) -> str:
+        return f"{self._prefix}:{key}"
+
+    def __queue(self, decoder: Callable[[Any], Any] = lambda value: value):
+        self._decoders.append(decoder)
+
+    async def execute(self) -> List[Any]:
+        """
+        Send all the queued commands
+        :return: the decoded result of each command in the order they were queued
+        """
+        if len(self._decoders) == 0:
+            return self.results
+
+        raw = await self._pipeline.execute()
+        self.results.extend(
+            decoder(value) for decoder, value in zip(self._decoders, raw)
+        )
+        self._decoders = []
+
+        return self.results
+
+    def get(self, key: str, *, is_json: bool = False):
+        self._pipeline.get(self.__format_key(key))
+        self.__queue(lambda value: decode(value, is_json))
+
+    def set(self, key: str, value: Any, expires_in: Optional[int] = None):
+        if expires_in is None:
+            self._pipeline.set(self.__format_key(key), encode(value, self._codec))
+        else:
+            self._pipeline.setex(
+                self.__format_key(key), expires_in, encode(value, self._codec)
+            )
+
+        self.__queue()
+
+    def delete(self, *keys: str):
+        self._pipeline.delete(*(self.__format_key(key) for key in keys))
+        self.__queue()
+
+    def hgetall(self, key: str, *, is_json: bool = False):
+        self._pipeline.hgetall(self.__format_key(key))
+        self.__queue(lambda values: decode_hash(values, is_json))
+
+    def hset(self, key: str, values: Mapping[str, Any]):
+        self._pipeline.hset(
+            self.__format_key(key), mapping=encode_hash(values, self._codec)
+        )
+        self.__queue()
+
+    def hdel(self, key: str, *fields: str):
+        self._pipeline.hdel(self.__format_key(key), *fields)
+        self.__queue()
+
+    def hincrby(self, key: str, field: str, amount: int = 1):
+        self._pipeline.hincrby(self.__format_key(key), field, amount)
+        self.__queue()
+
+    def expire(self, key: str, expires_in: int):
+        self._pipeline.expire(self.__format_key(key), expires_in)
+        self.__queue()
+
+    def exists(self, key: str):
+        self._pipeline.exists(self.__format_key(key))
+        self.__queue(lambda value: value == 1)
+
+    def getbit(self, key: str, offset: int):
+        self._pipeline.getbit(self.__format_key(key), offset)
+        self.__queue(lambda value: value == 1)
+
+    def setbit(self, key: str, offset: int, value: bool):
+        self._pipeline.setbit(self.__format_key(key), offset, int(value))
+        self.__queue()
+
+    def rename(self, source: str, destination: str):
+        self._pipeline.rename(self.__format_key(source), self.__format_key(destination))
+        self.__queue()
+
+    def zadd(self, key: str, mapping: Mapping[str, float]):
+        self._pipeline.zadd(self.__format_key(key), mapping)  # type: ignore
+        self.__queue()
+
+    def zrangebyscore(self, key: str, min: Union[float, str], max: Union[float, str]):
+        self._pipeline.zrangebyscore(self.__format_key(key), min, max, withscores=True)
+        self.__queue(decode_scores)
+
+    def zremrangebyscore(
+        self, key: str, min: Union[float, str], max: Union[float, str]
+    ):
+        self._pipeline.zremrangebyscore(self.__format_key(key), min, max)
+        self.__queue()
+
+    def publish(self, channel: str, message: str):
+        self._pipeline.publish(self.__format_key(channel), message)
+        self.__queue()
+
+
+def encode(value: Any, codec: Codec) -> Union[str, bytes]:
+    """
+    Convert a value for storage, strings are stored as-is while anything else is serialized by the codec
+    """
+    if isinstance(value, str):
+        return value
+
+    return codec.encode(value)
+
+
+def encode_hash(
+    values: Mapping[str, Any], codec: Codec
+) -> Dict[str, Union[str, bytes]]:
+    return {field: encode(value, codec) for field, value in values.items()}
+
+
+def decode(value: Optional[bytes], is_json: bool) -> Optional[Any]:
+    """
+    Convert a raw value from Redis, deserializing it if requested. Values written by a binary codec are always
+    returned as JSON text when not deserialized so that readers expecting a string keep working.
+    """
+    if value is None:
+        return None
+
+    if is_json:
+        return codecs.decode(value)
+    elif codecs.is_versioned(value):
+        return json.dumps(codecs.decode(value))
+    else:
+        return value.decode("utf-8")
+
+
+def decode_hash(values: Dict[bytes, bytes], is_json: bool) -> Dict[str, Any]:
+    return {
+        field.decode("utf-8"): decode(value, is_json) for field, value in values.items()
+    }
+
+
+def decode_reply(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    elif isinstance(value, list):
+        return [decode_reply(item) for item in value]
+
+    return value
+
+
+def decode_scores(members: List[Tuple[bytes, float]]) -> List[Tuple[str, float]]:
+    return [(member.decode("utf-8"), score) for member, score in members]
@@ -1,5 +1,6 @@
+import asyncio
 import json
-from typing import Any, Awaitable, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 
 from nats import NATS
 from nats.aio.msg import Msg
@@ -15,6 +16,9 @@ from .settings import SETTINGS
 __client = NATS()
 __propagator = TraceContextTextMapPropagator()
 
+# The most messages that can be waiting for an acknowledgement when publishing many at once
+PUBLISH_WINDOW = 64
+
 
 async def __connect() -> JetStreamContext:
     """
@@ -77,9 +81,48 @@ async def publish(subject: str, message: Any):
     """
     jetstream = await __connect()
 
-    # Inject tracing information
+    encoded = json.dumps(message, default=pydantic_encoder).encode()
+    await jetstream.publish(subject, encoded, headers=__trace_headers())
+
+
+async def publish_many(
+    messages: Iterable[Tuple[str, Any]], window: int = PUBLISH_WINDOW
+) -> List[Tuple[Tuple[str, Any], BaseException]]:
+    """
+    Publish many JSON-encoded messages without waiting for each acknowledgement in turn. Messages are sent
+    concurrently while at most `window` of them are awaiting an acknowledgement. A failed message does not stop the
+    others from being sent.
+    :param messages: pairs of the subject and message to publish
+    :param window: the most messages that can be awaiting an acknowledgement at once
+    :return: the messages that could not be published, along with why
+    """
+    jetstream = await __connect()
+    headers = __trace_headers()
+    semaphore = asyncio.Semaphore(window)
+
+    async def send(subject: str, message: Any):
+        encoded = json.dumps(message, default=pydantic_encoder).encode()
+        async with semaphore:
+            await jetstream.publish(subject, encoded, headers=headers)
+
+    pending = list(messages)
+    results = await asyncio.gather(
+        *(send(subject, message) for subject, message in pending),
+        return_exceptions=True,
+    )
+
+    return [
+        (message, result)
+        for message, result in zip(pending, results)
+        if isinstance(result, BaseException)
+    ]
+
+
+def __trace_headers() -> Dict[str, str]:
+    """
+    Inject tracing information into the message headers
+    """
     headers: Dict[str, str] = {}
     __propagator.inject(headers)
 
-    encoded = json.dumps(message, default=pydantic_encoder).encode()
-    await jetstream.publish(subject, encoded, headers=headers)
+    return headers
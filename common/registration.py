@@ -0,0 +1,397 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import Select
+
+from .database import Application, ApplicationStatus, School, versions
+from .kv import engine
+
+kv = engine.namespaced("registration")
+
+# A bitmap of the participant IDs who have submitted an application. Bits may be left set for deleted applications,
+# but are never missing for submitted ones, so only a cleared bit can be trusted without checking the database.
+APPLIED = "applied"
+APPLIED_REBUILDING = "applied:rebuilding"
+
+# Set once the index was built from the database, until then it cannot be trusted
+APPLIED_READY = "applied:ready"
+
+# Held by the process that requested a rebuild, so only one is requested at a time
+APPLIED_REBUILD_CLAIM = "applied:rebuild-claimed"
+APPLIED_REBUILD_CLAIM_EXPIRY = 5 * 60
+
+
+async def applied_ready() -> bool:
+    """
+    Check if the applied index has been built
+    """
+    return await kv.exists(APPLIED_READY)
+
+
+async def has_applied(participant_id: int) -> Optional[bool]:
+    """
+    Check if a participant has submitted an application without going to the database
+    :param participant_id: the participant to check
+    :return: whether the participant may have applied, or None if the index has not been built yet
+    """
+    async with kv.pipeline() as pipeline:
+        pipeline.exists(APPLIED_READY)
+        pipeline.getbit(APPLIED, participant_id)
+
+    ready, applied = pipeline.results
+    if not ready:
+        return None
+
+    return applied
+
+
+async def mark_applied(participant_id: int, applied: bool = True):
+    """
+    Record whether a participant has submitted an application
+    :param participant_id: the participant that changed
+    :param applied: whether the participant now has an application
+    """
+    # Also record the change in any index being rebuilt, so it is not lost when the rebuilt index replaces this one
+    async with kv.pipeline() as pipeline:
+        pipeline.setbit(APPLIED, participant_id, applied)
+        pipeline.setbit(APPLIED_REBUILDING, participant_id, applied)
+
+
+async def claim_applied_rebuild() -> bool:
+    """
+    Claim the right to request a rebuild of the applied index, so concurrently starting processes only request one
+    """
+    return await kv.set_if_missing(
+        APPLIED_REBUILD_CLAIM, "1", expires_in=APPLIED_REBUILD_CLAIM_EXPIRY
+    )
+
+
+async def rebuild_applied(db: AsyncSession) -> int:
+    """
+    Reconstruct the applied index from the database. Changes recorded while the index is being rebuilt are kept.
+    :param db: a database session
+    :return: the number of participants who have applied
+    """
+    # Start collecting changes before reading, so none made after the read are missed
+    await kv.delete(APPLIED_REBUILDING)
+
+    result = await db.execute(select(Application.participant_id))
+    ids = result.scalars().all()
+
+    async with kv.pipeline(transaction=True) as pipeline:
+        # Participant IDs start at 1, so this only ensures the key exists to be renamed
+        pipeline.setbit(APPLIED_REBUILDING, 0, False)
+        for id in ids:
+            pipeline.setbit(APPLIED_REBUILDING, id, True)
+
+        pipeline.rename(APPLIED_REBUILDING, APPLIED)
+        pipeline.set(APPLIED_READY, "1")
+
+    return len(ids)
+
+
+# The application fields that statistics are kept for, each stored as a hash of label to count
+DIMENSIONS = [
+    "status",
+    "gender",
+    "race_ethnicity",
+    "country",
+    "school",
+    "level_of_study",
+    "major",
+    "graduation_year",
+    "experience",
+    "day",
+]
+
+# The status each participant's application was counted under, making repeated events no-ops
+COUNTED = "statistics:counted"
+
+# The names of the schools that have been counted
+SCHOOL_NAMES = "statistics:school-names"
+
+# Set once the statistics were built from the database, until then they cannot be trusted
+STATISTICS_READY = "statistics:ready"
+
+# When the next scheduled reconciliation should run, any others are superseded
+NEXT_RECONCILIATION = "statistics:next-reconciliation"
+
+# Held by the process that requested an unscheduled reconciliation, so only one is requested at a time
+RECONCILIATION_CLAIM = "statistics:reconciliation-claimed"
+RECONCILIATION_CLAIM_EXPIRY = 5 * 60
+
+# The version bumped whenever the statistics change, for conditional requests
+STATISTICS_VERSION = "registration-statistics"
+
+# How often the statistics are recounted from the database
+RECONCILIATION_INTERVAL = timedelta(hours=1)
+
+
+def statistics_key(dimension: str) -> str:
+    return f"statistics:{dimension}"
+
+
+def statistics_statement() -> Select:
+    """
+    Build the query for the fields needed to count applications
+    """
+    return select(
+        Application.participant_id,
+        Application.status,
+        Application.gender,
+        Application.race_ethnicity,
+        Application.country,
+        Application.school_id,
+        School.name.label("school_name"),  # type: ignore
+        Application.level_of_study,
+        Application.major,
+        Application.graduation_year,
+        Application.hackathons_attended,
+        Application.created_at,
+    ).join(School)
+
+
+def experience_bucket(hackathons_attended: int) -> str:
+    if hackathons_attended == 0:
+        return "None"
+    elif hackathons_attended <= 2:
+        return "Beginner (1-2)"
+    elif hackathons_attended <= 5:
+        return "Intermediate (3-5)"
+    else:
+        return "Expert (6+)"
+
+
+def statistics_labels(row: Any) -> Dict[str, str]:
+    """
+    Determine the label an application is counted under for each dimension
+    :param row: a row returned by the statistics statement
+    """
+    labels = {
+        "status": row.status.value,
+        "gender": row.gender.value,
+        "race_ethnicity": row.race_ethnicity.value,
+        "country": row.country,
+        "school": row.school_id,
+        "level_of_study": row.level_of_study,
+        "major": row.major,
+        "graduation_year": str(row.graduation_year),
+        "experience": experience_bucket(row.hackathons_attended),
+        "day": row.created_at.astimezone(timezone.utc).date().isoformat(),
+    }
+
+    return {
+        dimension: label for dimension, label in labels.items() if label is not None
+    }
+
+
+async def statistics_ready() -> bool:
+    """
+    Check if the statistics have been built
+    """
+    return await kv.exists(STATISTICS_READY)
+
+
+async def get_statistics(dimension: str) -> Optional[Dict[str, int]]:
+    """
+    Get the number of applications with each label in a dimension
+    :param dimension: the dimension to get
+    :return: the counts for each label, or None if the statistics have not been built yet
+    """
+    async with kv.pipeline() as pipeline:
+        pipeline.exists(STATISTICS_READY)
+        pipeline.hgetall(statistics_key(dimension))
+
+    ready, counts = pipeline.results
+    if not ready:
+        return None
+
+    return {label: int(count) for label, count in counts.items() if int(count) > 0}
+
+
+async def get_school_names() -> Dict[str, str]:
+    """
+    Get the names of the schools that have been counted
+    """
+    return await kv.hgetall(SCHOOL_NAMES)
+
+
+# Marks an application as counted and increments its labels, unless it was already counted
+COUNT_SCRIPT = """
+if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 0 then
+    return 0
+end
+for i = 2, #KEYS do
+    redis.call('HINCRBY', KEYS[i], ARGV[i + 1], 1)
+end
+return 1
+"""
+
+# Moves a counted application to its new status, unless it is already counted under it
+MOVE_SCRIPT = """
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+if not previous or previous == ARGV[2] then
+    return 0
+end
+redis.call('HINCRBY', KEYS[2], previous, -1)
+redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+return 1
+"""
+
+# Removes a counted application, decrementing the status it was counted under and the rest of its labels
+DISCOUNT_SCRIPT = """
+local status = redis.call('HGET', KEYS[1], ARGV[1])
+if not status then
+    return 0
+end
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('HINCRBY', KEYS[2], status, -1)
+for i = 3, #KEYS do
+    redis.call('HINCRBY', KEYS[i], ARGV[i], -1)
+end
+return 1
+"""
+
+
+async def count_application(participant_id: int, db: AsyncSession):
+    """
+    Add a newly submitted application to the statistics, applications that were already counted are skipped
+    :param participant_id: the participant who applied
+    :param db: a database session
+    """
+    statement = statistics_statement().where(
+        Application.participant_id == participant_id
+    )
+    result = await db.execute(statement)
+    row = result.first()
+    if row is None:
+        return
+
+    labels = statistics_labels(row)
+    counted = await kv.eval(
+        COUNT_SCRIPT,
+        [COUNTED, *(statistics_key(dimension) for dimension in labels)],
+        [str(participant_id), row.status.value, *labels.values()],
+    )
+    if not counted:
+        return
+
+    await kv.hset(SCHOOL_NAMES, {row.school_id: row.school_name})
+    await versions.bump(STATISTICS_VERSION)
+
+
+async def discount_application(application: Application):
+    """
+    Remove a deleted application from the statistics, applications that were never counted are skipped
+    :param application: the application that was deleted
+    """
+    labels = statistics_labels(application)
+    del labels["status"]
+
+    discounted = await kv.eval(
+        DISCOUNT_SCRIPT,
+        [
+            COUNTED,
+            statistics_key("status"),
+            *(statistics_key(dimension) for dimension in labels),
+        ],
+        [str(application.participant_id), "", *labels.values()],
+    )
+    if discounted:
+        await versions.bump(STATISTICS_VERSION)
+
+
+async def count_status_change(participant_id: int, status: ApplicationStatus):
+    """
+    Move an application to its new status in the statistics. Applications that have not been counted yet are skipped
+    since they will be counted with their current status.
+    :param participant_id: the participant whose application changed
+    :param status: the application's new status
+    """
+    moved = await kv.eval(
+        MOVE_SCRIPT,
+        [COUNTED, statistics_key("status")],
+        [str(participant_id), status.value],
+    )
+    if moved:
+        await versions.bump(STATISTICS_VERSION)
+
+
+async def reconcile_statistics(db: AsyncSession) -> int:
+    """
+    Recount the statistics from the database, replacing any drift from missed events or edited applications. Changes
+    recorded while the statistics are being recounted may be lost until the next reconciliation.
+    :param db: a database session
+    :return: the number of applications counted
+    """
+    counts: Dict[str, Counter] = {dimension: Counter() for dimension in DIMENSIONS}
+    counted: Dict[str, str] = {}
+    school_names: Dict[str, str] = {}
+
+    result = await db.stream(statistics_statement())
+    async for row in result:
+        for dimension, label in statistics_labels(row).items():
+            counts[dimension][label] += 1
+
+        counted[str(row.participant_id)] = row.status.value
+        school_names[row.school_id] = row.school_name
+
+    async with kv.pipeline(transaction=True) as pipeline:
+        pipeline.delete(COUNTED, SCHOOL_NAMES, *(statistics_key(d) for d in DIMENSIONS))
+
+        for dimension, labels in counts.items():
+            if len(labels) > 0:
+                pipeline.hset(
+                    statistics_key(dimension),
+                    {label: str(count) for label, count in labels.items()},
+                )
+
+        if len(counted) > 0:
+            pipeline.hset(COUNTED, counted)
+            pipeline.hset(SCHOOL_NAMES, school_names)
+
+        pipeline.set(STATISTICS_READY, "1")
+
+    await versions.bump(STATISTICS_VERSION)
+
+    return len(counted)
+
+
+async def schedule_reconciliation(at: datetime):
+    """
+    Record when the next reconciliation should run, superseding any previously scheduled ones
+    :param at: when the reconciliation will run
+    """
+    await kv.set(NEXT_RECONCILIATION, at.isoformat())
+
+
+async def is_reconciliation_scheduled(at: datetime) -> bool:
+    """
+    Check if a reconciliation is still the most recently scheduled one
+    :param at: when the reconciliation was scheduled for
+    """
+    return await kv.get(NEXT_RECONCILIATION) == at.isoformat()
+
+
+async def reconciliation_overdue() -> bool:
+    """
+    Check if the scheduled reconciliations have stopped, i.e. on first deploy or after Redis is flushed
+    """
+    at = await kv.get(NEXT_RECONCILIATION)
+    if at is None:
+        return True
+
+    return datetime.fromisoformat(at) + RECONCILIATION_INTERVAL < datetime.utcnow()
+
+
+async def claim_reconciliation() -> bool:
+    """
+    Claim the right to request an unscheduled reconciliation, so concurrently starting processes only request one
+    """
+    return await kv.set_if_missing(
+        RECONCILIATION_CLAIM, "1", expires_in=RECONCILIATION_CLAIM_EXPIRY
+    )
@@ -0,0 +1,13 @@
+from .kv import engine
+
+kv = engine.namespaced("schedule")
+
+# Published whenever a workshop changes so every process drops its copies of the schedule and events
+CHANGED = "changed"
+
+
+async def notify_changed():
+    """
+    Tell every process that the public schedule changed
+    """
+    await kv.publish(CHANGED, "1")
@@ -1,18 +1,55 @@
+from enum import Enum
+from typing import Optional
+
 from pydantic import BaseSettings, RedisDsn
 
 from .types import NATSUrl, PostgresDsn
 
 
+class KVFormat(Enum):
+    # Plain JSON text, readable by any version
+    Json = "json"
+    # JSON serialized by orjson
+    OrJson = "orjson"
+    # MessagePack
+    MsgPack = "msgpack"
+    # MessagePack, compressed with zstd above the compression threshold
+    ZstdMsgPack = "zstd-msgpack"
+
+
 class Settings(BaseSettings):
     # The Postgres database to connect to
     database_url: PostgresDsn
 
+    # An optional read replica of the database for heavy read-only queries
+    database_replica_url: Optional[PostgresDsn]
+
+    # The number of connections to keep open per process, and how many more can be opened under load
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+
+    # How long to wait for a connection before giving up in seconds
+    database_pool_timeout: float = 30
+
+    # The maximum age of a connection before it is replaced in seconds, -1 disables recycling
+    database_pool_recycle: int = -1
+
+    # The number of prepared statements asyncpg caches per connection, 0 disables the cache
+    database_statement_cache_size: int = 100
+
     # The NATS JetStream instance to connect to
     nats_url: NATSUrl
 
     # The Redis store to connect to
     redis_url: RedisDsn
 
+    # How to serialize values in the namespaces with large or frequently accessed values (sessions).
+    # Values are always readable regardless of the format they were written with.
+    kv_format: KVFormat = KVFormat.Json
+
+    # The size in bytes after which values are compressed, if the codec supports it
+    kv_compression_threshold: int = 1024
+
     # The S3 bucket for storing data exports
     export_bucket: str
 
@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from common.nats import publish
+from common.nats import publish, publish_many
 
 
 async def broadcast(service: str, event: str, **kwargs):
@@ -13,6 +13,21 @@ async def broadcast(service: str, event: str, **kwargs):
     await publish(f"{service}.automated.{event}", kwargs)
 
 
+async def broadcast_many(
+    service: str, event: str, payloads: Iterable[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Broadcast an automated event once for each set of parameters, without waiting for each to be acknowledged in turn
+    :param service: the service that owns the event
+    :param event: the event to trigger
+    :param payloads: the parameters to pass to the handlers for each event
+    :return: the parameters of the events that could not be broadcast
+    """
+    subject = f"{service}.automated.{event}"
+    failed = await publish_many((subject, payload) for payload in payloads)
+    return [payload for (_, payload), _ in failed]
+
+
 class TasksProxy(object):
     def __init__(self, previous: Optional[List[str]] = None):
         self.__previous = previous or []
@@ -3,6 +3,7 @@ import importlib
 import json
 import sys
 from functools import wraps
+from pathlib import Path
 from traceback import format_exc
 from typing import Any, Dict, Iterable, List, Optional
 
@@ -192,6 +193,67 @@ async def seed_database(obj: Dict[str, List[Dict[str, Any]]]):
         await db.commit()
 
 
+@cli.command(name="check-plans")
+@click.option(
+    "-t",
+    "--threshold",
+    type=int,
+    default=1000,
+    show_default=True,
+    help="The number of rows a table can have before sequentially scanning it fails",
+)
+@click.option(
+    "-s",
+    "--seed",
+    "seed_rows",
+    type=int,
+    default=10000,
+    show_default=True,
+    help="The number of synthetic participants to create, 0 uses the existing data",
+)
+@coroutine
+async def check_plans(threshold: int, seed_rows: int):
+    """
+    Check that the hot statements do not sequentially scan large tables. All changes are rolled back afterwards.
+    """
+    # Import here, so we don't need a database connection for every command
+    from common.database import engine, plans, statements
+
+    # Load every module that registers hot statements
+    importlib.import_module("api.main")
+    resolver = importlib.import_module("tasks.loader.resolver")
+    resolver.resolve(Path("./tasks/handlers"))
+
+    failed = False
+
+    async with engine.connect() as connection:
+        if seed_rows > 0:
+            await plans.seed(connection, seed_rows)
+
+        for statement in statements.registered():
+            if statement.full_scan:
+                click.echo(f"skipped {statement.name}")
+                continue
+
+            scans = await plans.sequential_scans(
+                connection, statement.statement, threshold
+            )
+            if len(scans) == 0:
+                click.echo(f"passed {statement.name}")
+            else:
+                click.echo(
+                    f"FAILED {statement.name}: sequential scan on {', '.join(scans)}"
+                )
+                failed = True
+
+        await connection.rollback()
+
+    await engine.dispose()
+
+    if failed:
+        sys.exit(1)
+
+
 @cli.command()
 @click.argument("namespace")
 @click.argument("event")
@@ -15,6 +15,7 @@ from common.database import (
     Participant,
     Role,
     db_context,
+    hot,
 )
 from tasks.settings import SETTINGS
 
@@ -97,3 +98,11 @@ def recipients_query(groups: Set[Group]) -> Select:
     # Only filter on status
     else:
         return base.where(status_filter)
+
+
+for group in Group:
+    hot(
+        f"recipients-{group.name.lower()}",
+        recipients_query({group}).where(Participant.role == Role.Participant),
+        full_scan=True,
+    )
@@ -13,6 +13,7 @@ from common.database import (
     Participant,
     db_context,
 )
+from common.registration import has_applied
 from tasks.settings import SETTINGS
 
 shared = True
@@ -81,14 +82,18 @@ async def send_triggered_message(
 async def send_incomplete_message(id: int, trigger_type: MessageTriggerType):
     span = trace.get_current_span()
 
-    async with db_context() as db:
-        application = await db.get(Application, id)
-        if application is not None:
-            span.set_attribute("complete", True)
-            logger.info(
-                f"participant '{id}' completed application within 24hr, not sending reminder"
-            )
-            return
+    # Only skip the database if the index rules out an application
+    applied = await has_applied(id)
+    if applied is not False:
+        async with db_context() as db:
+            applied = await db.get(Application, id) is not None
+
+    if applied:
+        span.set_attribute("complete", True)
+        logger.info(
+            f"participant '{id}' completed application within 24hr, not sending reminder"
+        )
+        return
 
     span.set_attribute("complete", False)
     await send_triggered_message(id, trigger_type)
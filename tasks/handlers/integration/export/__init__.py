@@ -6,7 +6,7 @@ from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from common.aws import with_s3
-from common.database import Export, ExportStatus, db_context
+from common.database import Export, ExportStatus, db_context, db_readonly_context, hot
 from common.settings import SETTINGS
 
 from .applications import All, MLHRegistered, ResumeBook
@@ -33,6 +33,15 @@ EXPORTERS: Dict[str, Dict[str, Exporter]] = {
     },
 }
 
+for table, exporters in EXPORTERS.items():
+    for kind, exporter in exporters.items():
+        hot(
+            f"export-{table}-{kind}",
+            exporter.statement,
+            readonly=True,
+            full_scan=True,
+        )
+
 
 async def handler(export_id: int, table: str, kind: str):
     async with db_context() as db:
@@ -53,7 +62,9 @@ async def handler(export_id: int, table: str, kind: str):
             await mark_export(ExportStatus.FAILED, export, db)
             return
 
-        csv = await exporter.export(db)
+        # Keep the heavy reads off the primary
+        async with db_readonly_context() as replica:
+            csv = await exporter.export(replica)
 
         filename = str(uuid4()) + ".csv"
         s3.put_object(
@@ -2,7 +2,7 @@ import codecs
 import logging
 from csv import DictReader, DictWriter, excel
 from io import BytesIO, StringIO
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from botocore.exceptions import ClientError
 from opentelemetry import trace
@@ -10,9 +10,10 @@ from pydantic import BaseModel, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Select
 
 from common.aws import with_s3
-from common.database import Application, ApplicationStatus, Participant, db_context
+from common.database import Application, ApplicationStatus, Participant, db_context, hot
 from common.kv import engine
 from common.settings import SETTINGS
 
@@ -125,12 +126,7 @@ async def process_row(
             "Reason": f"too many codes provided: {', '.join(codes)}",
         }
 
-    query_result = await db.execute(
-        select(Participant)
-        .where(Participant.id == Application.participant_id)
-        .where(Application.status == ApplicationStatus.ACCEPTED)
-        .where(Participant.project_code.in_(codes))  # type: ignore
-    )
+    query_result = await db.execute(participants_by_project_code(codes))
     participants = query_result.scalars().all()
 
     result = {"Name": name, "URL": url}
@@ -152,6 +148,22 @@ async def process_row(
     return True, result
 
 
+def participants_by_project_code(codes: Iterable[str]) -> Select:
+    """
+    Build the query for the accepted participants with any of the project codes
+    :param codes: the project codes to look for
+    """
+    return (
+        select(Participant)
+        .where(Participant.id == Application.participant_id)
+        .where(Application.status == ApplicationStatus.ACCEPTED)
+        .where(Participant.project_code.in_(codes))  # type: ignore
+    )
+
+
+hot("participants-by-project-code", participants_by_project_code([""]))
+
+
 def parse_codes(raw: str) -> Set[str]:
     raw = raw.lower().replace(" ", "")
 
@@ -0,0 +1,12 @@
+from opentelemetry import trace
+
+from common.database import ApplicationStatus
+from common.registration import count_status_change
+
+event = "registration.accepted"
+
+
+async def handler(participant_id: int):
+    trace.get_current_span().set_attribute("user.id", participant_id)
+
+    await count_status_change(participant_id, ApplicationStatus.ACCEPTED)
@@ -0,0 +1,13 @@
+from opentelemetry import trace
+
+from common.database import db_context
+from common.registration import count_application
+
+event = "registration.new_application"
+
+
+async def handler(participant_id: int):
+    trace.get_current_span().set_attribute("user.id", participant_id)
+
+    async with db_context() as db:
+        await count_application(participant_id, db)
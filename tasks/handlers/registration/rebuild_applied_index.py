@@ -0,0 +1,15 @@
+import logging
+
+from common.database import db_context
+from common.registration import rebuild_applied
+
+manual = True
+
+logger = logging.getLogger(__name__)
+
+
+async def handler():
+    async with db_context() as db:
+        count = await rebuild_applied(db)
+
+    logger.info(f"rebuilt applied index with {count} participants")
@@ -0,0 +1,40 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from common.database import db_context
+from common.registration import (
+    RECONCILIATION_INTERVAL,
+    is_reconciliation_scheduled,
+    reconcile_statistics,
+    schedule_reconciliation,
+)
+from common.tasks import tasks
+from tasks.handlers.models import Response
+
+manual = True
+
+logger = logging.getLogger(__name__)
+
+
+async def handler(at: Optional[datetime] = None) -> Response:
+    if at is not None:
+        # Check if we need to delay allowing for some jitter
+        delta = at - datetime.utcnow()
+        if delta.total_seconds() > 5:
+            return Response.delay_for(delta.total_seconds())
+
+        # Another reconciliation was scheduled since this one
+        if not await is_reconciliation_scheduled(at):
+            return Response.success()
+
+    async with db_context() as db:
+        count = await reconcile_statistics(db)
+
+    logger.info(f"reconciled registration statistics with {count} applications")
+
+    next_at = datetime.utcnow() + RECONCILIATION_INTERVAL
+    await schedule_reconciliation(next_at)
+    await tasks.registration.reconcile_statistics(at=next_at)
+
+    return Response.success()
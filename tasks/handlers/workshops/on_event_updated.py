@@ -0,0 +1,11 @@
+from opentelemetry import trace
+
+from common.schedule import notify_changed
+
+event = "workshops.updated"
+
+
+async def handler(event_id: int):
+    trace.get_current_span().set_attribute("event.id", event_id)
+
+    await notify_changed()
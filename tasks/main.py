@@ -5,7 +5,7 @@ import sys
 from asyncio import StreamReader, StreamWriter
 from pathlib import Path
 
-from common import database, nats, tracing, version
+from common import database, kv, nats, tracing, version
 
 from . import loader
 from .settings import SETTINGS
@@ -31,6 +31,9 @@ def main():
 
     loop.run_until_complete(database.warm_up())
 
+    # Receive cache invalidations from the other processes
+    loop.call_soon(kv.listen)
+
     def on_shutdown():
         logger.info("received shutdown signal")
         loop.stop()
@@ -64,6 +67,8 @@ def main():
     try:
         loop.run_forever()
     finally:
+        # The loop is stopped, so run the cleanup to completion on it directly
+        loop.run_until_complete(kv.close())
         logger.info("shutdown successfully, bye :)")
 
 